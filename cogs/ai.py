@@ -5,10 +5,13 @@ This cog contains AI-related commands like the lumos conversation command.
 """
 import os
 import asyncio
+import logging
 import discord
 from discord.ext import commands
 import config
-from core.ai_services import stream_response_with_history
+from core.ai_services import stream_response_with_history, warm_up
+
+logger = logging.getLogger(__name__)
 
 class AICog(commands.Cog, name="AI"):
     """AI interaction commands."""
@@ -17,6 +20,13 @@ class AICog(commands.Cog, name="AI"):
         self.bot = bot
         # Initialize conversation history storage
         self.conversations = {}  # User ID -> list of conversation turns (dicts with role and content)
+        self._warm_up_task = None
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pre-warm the AI client connection pool once the bot is connected."""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(warm_up())
     
     @commands.command(name="lumos")
     async def lumos(self, ctx, *, user_message: str = None):
@@ -111,10 +121,10 @@ class AICog(commands.Cog, name="AI"):
                     try:
                         os.remove(image_file)
                     except Exception as e:
-                        print(f"Failed to delete temporary file {image_file}: {e}")
+                        logger.error(f"Failed to delete temporary file {image_file}: {e}")
                 
         except Exception as e:
-            print(f"Error in lumos command: {str(e)}")
+            logger.error(f"Error in lumos command: {str(e)}")
             await ctx.send("Sorry, I encountered an error while processing your request. Please try again later.")
     
     @commands.command(name="memory")
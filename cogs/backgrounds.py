@@ -3,6 +3,7 @@ Backgrounds Cog
 
 This cog handles background management for welcome cards.
 """
+import logging
 import discord
 from discord.ext import commands
 from services.welcome_cards import (
@@ -10,6 +11,8 @@ from services.welcome_cards import (
     list_backgrounds, create_background_preview
 )
 
+logger = logging.getLogger(__name__)
+
 class BackgroundsCog(commands.Cog, name="Backgrounds"):
     """Background management commands for welcome cards."""
     
@@ -76,7 +79,7 @@ class BackgroundsCog(commands.Cog, name="Backgrounds"):
             # Download the attachment
             try:
                 attachment_data = await attachment.read()
-                print(f"Successfully read attachment: {len(attachment_data)} bytes")
+                logger.info(f"Successfully read attachment: {len(attachment_data)} bytes")
             except Exception as e:
                 await ctx.send(f"Error reading attachment: {str(e)}")
                 return
@@ -107,9 +110,8 @@ class BackgroundsCog(commands.Cog, name="Backgrounds"):
                 else:
                     await ctx.send(f"Failed to add background `{name}`. The name may be taken or the image is invalid.")
             except Exception as e:
+                logger.exception(f"Error adding background: {e}")
                 await ctx.send(f"Error adding background: {str(e)}")
-                import traceback
-                traceback.print_exc()
 
     @backgrounds.command(name="remove")
     async def remove_bg(self, ctx, name: str):
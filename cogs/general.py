@@ -3,14 +3,15 @@ General Commands Cog
 
 This cog contains general utility commands like help, info, and ping.
 """
-import platform
 import time
+import logging
 import discord
 from discord.ext import commands, tasks
-import datetime
 
 import config
-from utils import get_uptime
+from utils import get_uptime, get_platform_info
+
+logger = logging.getLogger(__name__)
 
 class GeneralCog(commands.Cog, name="General"):
     """General commands for basic bot interactions."""
@@ -27,12 +28,11 @@ class GeneralCog(commands.Cog, name="General"):
     @commands.command(name='ping')
     async def ping(self, ctx):
         """Show the bot's latency."""
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         msg = await ctx.send('Pinging...')
-        end_time = time.time()
         
         # Calculate ping in ms
-        ping_latency = round((end_time - start_time) * 1000)
+        ping_latency = (time.monotonic_ns() - start_ns) // 1_000_000
         await msg.edit(content=f'Pong! Latency: {ping_latency}ms | API Latency: {round(self.bot.latency * 1000)}ms')
 
     @commands.command(name='info')
@@ -50,8 +50,9 @@ class GeneralCog(commands.Cog, name="General"):
         embed.add_field(name="Discord.py Version", 
                        value=f"{discord_version.major}.{discord_version.minor}.{discord_version.micro}", 
                        inline=True)
-        embed.add_field(name="Python Version", value=platform.python_version(), inline=True)
-        embed.add_field(name="Platform", value=platform.system() + " " + platform.release(), inline=True)
+        python_version, platform_name = get_platform_info()
+        embed.add_field(name="Python Version", value=python_version, inline=True)
+        embed.add_field(name="Platform", value=platform_name, inline=True)
         
         # Runtime stats
         embed.add_field(name="Uptime", value=get_uptime(), inline=True)
@@ -146,16 +147,16 @@ class GeneralCog(commands.Cog, name="General"):
     async def daily_announcement(self):
         """Send a daily announcement to the configured channel."""
         if config.ANNOUNCEMENT_CHANNEL_ID == 0:
-            print("WARNING: No announcement channel ID set. Skipping daily announcement.")
+            logger.warning("No announcement channel ID set. Skipping daily announcement.")
             return
         
         try:
             channel = self.bot.get_channel(config.ANNOUNCEMENT_CHANNEL_ID)
             if not channel:
-                print(f"ERROR: Could not find channel with ID {config.ANNOUNCEMENT_CHANNEL_ID}")
+                logger.error(f"Could not find channel with ID {config.ANNOUNCEMENT_CHANNEL_ID}")
                 return
                 
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            current_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
             embed = discord.Embed(
                 title="Daily Announcement", 
                 description="This is an automated daily announcement from AI Discord Bot.", 
@@ -166,9 +167,9 @@ class GeneralCog(commands.Cog, name="General"):
             embed.set_footer(text=f"Bot Version: {config.BOT_VERSION}")
             
             await channel.send(embed=embed)
-            print(f"Daily announcement sent at {current_time}")
+            logger.info(f"Daily announcement sent at {current_time}")
         except Exception as e:
-            print(f"ERROR: Failed to send daily announcement: {str(e)}")
+            logger.error(f"Failed to send daily announcement: {str(e)}")
     
     @daily_announcement.before_loop
     async def before_daily_announcement(self):
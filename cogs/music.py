@@ -3,20 +3,18 @@ Music Cog
 
 This cog implements music playback commands using Lavalink.
 """
-import os
 import asyncio
 import re
+import logging
 import datetime
 import discord
 from discord.ext import commands
 import wavelink
 
+import config
 from services.music import MusicService
 
-# Load environment variables or use defaults for Lavalink
-LAVALINK_HOST = os.getenv("LAVALINK_HOST", "127.0.0.1")
-LAVALINK_PORT = int(os.getenv("LAVALINK_PORT", 2333))
-LAVALINK_PASSWORD = os.getenv("LAVALINK_PASSWORD", "youshallnotpass")
+logger = logging.getLogger(__name__)
 
 class MusicCog(commands.Cog, name="Music"):
     """Music playback commands through Lavalink."""
@@ -26,9 +24,9 @@ class MusicCog(commands.Cog, name="Music"):
         self.bot = bot
         self.music_service = MusicService(
             bot=bot, 
-            lavalink_host=LAVALINK_HOST,
-            lavalink_port=LAVALINK_PORT,
-            lavalink_password=LAVALINK_PASSWORD
+            lavalink_host=config.LAVALINK_HOST,
+            lavalink_port=config.LAVALINK_PORT,
+            lavalink_password=config.LAVALINK_PASSWORD
         )
         
     async def cog_load(self):
@@ -38,7 +36,7 @@ class MusicCog(commands.Cog, name="Music"):
     @commands.Cog.listener()
     async def on_wavelink_node_ready(self, node):
         """Event triggered when wavelink node is ready."""
-        print(f'Lavalink node {node.identifier} is ready!')
+        logger.info(f'Lavalink node {node.identifier} is ready!')
         
     @commands.Cog.listener()
     async def on_wavelink_track_end(self, player, track, reason):
@@ -133,7 +131,7 @@ class MusicCog(commands.Cog, name="Music"):
                     
         except Exception as e:
             await loading_msg.edit(content=f"❌ Error: {str(e)}")
-            print(f"Error playing music: {e}")
+            logger.error(f"Error playing music: {e}")
             
     @commands.command(name="pause")
     async def pause(self, ctx):
@@ -227,7 +225,7 @@ class MusicCog(commands.Cog, name="Music"):
         # Add upcoming tracks
         if controller.queue:
             queue_description = ""
-            for i, track_obj in enumerate(controller.queue[:10]):  # Limit to first 10 tracks
+            for i, track_obj in enumerate(controller.peek(10)):  # Limit to first 10 tracks
                 track = track_obj.track
                 requester = track_obj.requester
                 duration = str(datetime.timedelta(seconds=track.duration // 1000))
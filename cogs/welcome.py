@@ -3,28 +3,46 @@ Welcome Cog
 
 This cog handles welcome messages and welcome card generation for new members.
 """
+import asyncio
+import logging
 import discord
 from discord.ext import commands
 import config
-from services.welcome_cards import create_welcome_card, create_welcome_embed
+from services.welcome_cards import (
+    create_welcome_card, create_welcome_embed, warm_up_welcome_cards, close_download_session,
+    CARD_FILENAME
+)
+
+logger = logging.getLogger(__name__)
 
 class WelcomeCog(commands.Cog, name="Welcome"):
     """Welcome card and new member events."""
     
     def __init__(self, bot):
         self.bot = bot
+        self._warm_up_task = None
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pre-load welcome card fonts and images once the bot is connected."""
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.create_task(warm_up_welcome_cards())
+    
+    async def cog_unload(self):
+        """Close the shared image download session when the cog is unloaded."""
+        await close_download_session()
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Send welcome message when a new member joins the server."""
         if config.WELCOME_CHANNEL_ID == 0:
-            print("WARNING: No welcome channel ID set. Skipping welcome message.")
+            logger.warning("No welcome channel ID set. Skipping welcome message.")
             return
         
         try:
             welcome_channel = self.bot.get_channel(config.WELCOME_CHANNEL_ID)
             if not welcome_channel:
-                print(f"ERROR: Could not find welcome channel with ID {config.WELCOME_CHANNEL_ID}")
+                logger.error(f"Could not find welcome channel with ID {config.WELCOME_CHANNEL_ID}")
                 return
                 
             # Generate welcome card
@@ -49,14 +67,14 @@ class WelcomeCog(commands.Cog, name="Welcome"):
                 # Send the welcome card with the embed
                 await welcome_channel.send(
                     content=f"Welcome {member.mention} to the server!",
-                    file=discord.File(fp=card_buffer, filename="welcome.png"),
+                    file=discord.File(fp=card_buffer, filename=CARD_FILENAME),
                     embed=welcome_embed
                 )
-                print(f"Welcome card sent for {member.display_name}")
+                logger.info(f"Welcome card sent for {member.display_name}")
             else:
                 await welcome_channel.send(f"Welcome {member.mention} to the server!")
         except Exception as e:
-            print(f"ERROR: Failed to send welcome message: {str(e)}")
+            logger.error(f"Failed to send welcome message: {str(e)}")
 
     @commands.command(name='welcome')
     @commands.has_permissions(administrator=True)
@@ -100,13 +118,13 @@ class WelcomeCog(commands.Cog, name="Welcome"):
                     # Send the welcome card with the embed
                     await ctx.send(
                         content="Here's a preview of the welcome card:",
-                        file=discord.File(fp=card_buffer, filename="welcome.png"),
+                        file=discord.File(fp=card_buffer, filename=CARD_FILENAME),
                         embed=welcome_embed
                     )
                 else:
                     await ctx.send("Error generating welcome card.")
         except Exception as e:
-            print(f"Error in welcome command: {str(e)}")
+            logger.error(f"Error in welcome command: {str(e)}")
             await ctx.send(f"Failed to generate welcome card: {str(e)}")
 
 async def setup(bot):
@@ -2,6 +2,8 @@
 AI Discord Bot - Configuration Module
 
 This module centralizes configuration settings and constants for the bot.
+Environment variables are read once at import time; changing them afterwards
+requires a restart (or module reload) to take effect.
 """
 import os
 from typing import Final
@@ -30,6 +32,8 @@ MODEL_NAME: Final[str] = os.getenv('MODEL_NAME', 'gpt-4o')
 # Welcome Card Configuration
 WELCOME_BACKGROUND_URL: Final[str] = os.getenv('WELCOME_BACKGROUND_URL', '')
 USE_RANDOM_BACKGROUNDS: Final[bool] = os.getenv('USE_RANDOM_BACKGROUNDS', 'false').lower() == 'true'
+# Download avatars/backgrounds over IPv6 too (dual-stack hosts); IPv4-only by default
+WELCOME_DOWNLOAD_IPV6: Final[bool] = os.getenv('WELCOME_DOWNLOAD_IPV6', 'false').lower() == 'true'
 
 # Memory Configuration
 MAX_MEMORY_LENGTH: Final[int] = int(os.getenv('MAX_MEMORY_LENGTH', '10'))
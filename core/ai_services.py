@@ -4,35 +4,148 @@ AI Discord Bot - AI Services Module
 This module handles the interaction with the AI model to generate responses.
 It includes functions to process text and image inputs and generate responses.
 """
+import io
 import os
+import re
 import base64
-import traceback
-from typing import Optional, AsyncGenerator, Tuple, List, Dict
+import asyncio
+import logging
+from typing import Any, Optional, AsyncGenerator, Tuple, List, Dict
 from random import choice
-from openai import OpenAI
-from dotenv import load_dotenv
+import httpx
+from PIL import Image
+from openai import AsyncOpenAI
+
+import config
 
 # --- Initialization ---
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Endpoint, API key and model come from config, which reads the environment once at import
+endpoint = config.AZURE_ENDPOINT
+api_key = config.OPENAI_API_KEY
+model_name = config.MODEL_NAME
 
-# Configure endpoint and API key
-endpoint = os.getenv("AZURE_ENDPOINT", "https://models.inference.ai.azure.com")
-api_key = os.getenv("OPENAI_API_KEY")
-model_name = os.getenv("MODEL_NAME", "gpt-4o")
+# Shared HTTP connection pool so every request reuses warm keep-alive connections
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    timeout=httpx.Timeout(60.0, connect=10.0),
+)
+
+# Number of retries (with exponential backoff) for rate limits, timeouts and 5xx errors
+AI_MAX_RETRIES = 3
 
 # Initialize OpenAI client
-ai_client = OpenAI(
+ai_client = AsyncOpenAI(
     base_url=endpoint,
     api_key=api_key,
+    http_client=http_client,
+    max_retries=AI_MAX_RETRIES,
 )
 
+async def warm_up() -> None:
+    """
+    Establish the connection pool to the AI endpoint ahead of the first request.
+
+    This pays the DNS and TLS handshake cost off the critical path. Failures are
+    logged and ignored, since the endpoint may not support listing models.
+    """
+    try:
+        await ai_client.models.list()
+        logger.info("AI client connection pool warmed up")
+    except Exception as e:
+        logger.warning(f"AI client warm-up failed: {e}")
+
+# Canned replies used when the AI API call fails
+FALLBACK_RESPONSES = (
+    "I don't know what you mean by that.",
+    "I don't understand.",
+    "I'm sorry, I don't know what you mean."
+)
+
+# Replies for trivial messages that don't need a model round-trip
+QUICK_REPLIES = {
+    "hi": "Hey!",
+    "hey": "Hey!",
+    "hello": "Hello!",
+    "ping": "Pong!",
+    "good morning": "Good morning!",
+    "good night": "Good night!",
+}
+
+# Acknowledgements like "lol", "ok" or "thanks"
+_ACKNOWLEDGEMENT_RE = re.compile(r"^(?:lol+|lmao+|ok+|okay|thanks?|thx|ty)[.!]*$")
+
 # --- Helper Functions ---
 
+def get_quick_reply(user_input: str) -> Optional[str]:
+    """
+    Get a canned reply for trivial messages that start a conversation.
+
+    Args:
+        user_input: The text input from the user.
+
+    Returns:
+        The local reply, or None if the message should go to the AI model.
+    """
+    normalized = user_input.strip().lower()
+    reply = QUICK_REPLIES.get(normalized.rstrip("!."))
+    if reply:
+        return reply
+    if _ACKNOWLEDGEMENT_RE.match(normalized):
+        return "👍"
+    return None
+
+# Read size for streaming base64 encoding (57 KiB, a multiple of 3 bytes)
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# Images are sent with detail "low", which the model sees at 512px at most,
+# so larger uploads are downscaled and re-encoded as JPEG before sending
+IMAGE_MAX_DIMENSION = 512
+IMAGE_JPEG_QUALITY = 80
+IMAGE_TRANSCODE_THRESHOLD = 64 * 1024  # Smaller files are sent as-is
+
+def downscale_image(image_file: str) -> Optional[bytes]:
+    """
+    Downscale an image to the low-detail size and re-encode it as JPEG.
+
+    Transparent images are flattened onto white, since JPEG has no alpha.
+    This is blocking CPU work; async callers run it in a worker thread.
+
+    Args:
+        image_file: The path to the image file.
+
+    Returns:
+        The JPEG bytes, or None if the image could not be processed.
+    """
+    try:
+        with Image.open(image_file) as image:
+            image.draft("RGB", (IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+            image.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+            
+            if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+                # Composite onto white; a plain RGB conversion would turn transparent areas black
+                rgba = image.convert("RGBA")
+                flat = Image.new("RGB", rgba.size, (255, 255, 255))
+                flat.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                flat = image.convert("RGB")
+            
+            buffer = io.BytesIO()
+            flat.save(buffer, format="JPEG", quality=IMAGE_JPEG_QUALITY)
+            return buffer.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not downscale '{image_file}', sending original: {e}")
+        return None
+
 def get_image_data_url(image_file: str, image_format: str) -> str:
     """
     Convert an image file to a data URL string.
 
+    Files above IMAGE_TRANSCODE_THRESHOLD are downscaled to JPEG first.
+
     Args:
         image_file (str): The path to the image file.
         image_format (str): The format of the image file.
@@ -41,11 +154,19 @@ def get_image_data_url(image_file: str, image_format: str) -> str:
         str: The data URL of the image or empty string if file not found.
     """
     try:
-        with open(image_file, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode("utf-8")
-        return f"data:image/{image_format};base64,{image_data}"
+        if os.path.getsize(image_file) > IMAGE_TRANSCODE_THRESHOLD:
+            jpeg_data = downscale_image(image_file)
+            if jpeg_data:
+                return f"data:image/jpeg;base64,{base64.b64encode(jpeg_data).decode('ascii')}"
+        
+        buffer = bytearray(f"data:image/{image_format};base64,".encode("ascii"))
+        with open(image_file, "rb", buffering=1 << 16) as f:
+            # Chunk size is a multiple of 3 so no padding appears until EOF
+            while chunk := f.read(BASE64_CHUNK_SIZE):
+                buffer += base64.b64encode(chunk)
+        return buffer.decode("ascii")
     except FileNotFoundError:
-        print(f"Could not read '{image_file}'.")
+        logger.error(f"Could not read '{image_file}'.")
         return ""
 
 # --- Multi-turn Conversation Types ---
@@ -55,6 +176,67 @@ Message = Dict[str, str]  # {"role": "...", "content": "..."}
 
 # --- Core Response Functions ---
 
+async def build_messages(
+    user_input: str,
+    conversation_history: Optional[List[Message]],
+    image_file: Optional[str],
+    image_format: Optional[str]
+) -> Optional[Tuple[List[Dict[str, Any]], Message]]:
+    """
+    Build the request messages shared by the streaming and non-streaming paths.
+
+    Reading and downscaling an attached image happens in a worker thread, so
+    large uploads don't block the event loop.
+
+    Args:
+        user_input: The text input from the user.
+        conversation_history: Optional list of previous messages in the conversation.
+        image_file: Optional path to an image file.
+        image_format: Optional format of the image file.
+
+    Returns:
+        A tuple of (request_messages, user_message_for_history), or None if the
+        image could not be read.
+    """
+    # Start with system message
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    
+    # Add conversation history if provided
+    if conversation_history:
+        messages.extend(conversation_history)
+    
+    # Add current user message
+    if image_file and image_format:
+        image_data_url = await asyncio.to_thread(get_image_data_url, image_file, image_format)
+        if not image_data_url:
+            return None
+        
+        # Add user message with image
+        messages.append({
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": user_input or "What's in this image?",
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_data_url,
+                        "detail": "low"
+                    },
+                },
+            ]
+        })
+        
+        # Create a text-only version of the message for history
+        user_message = {"role": "user", "content": user_input or "What's in this image? [Image attached]"}
+    else:
+        user_message = {"role": "user", "content": user_input}
+        messages.append(user_message)
+    
+    return messages, user_message
+
 async def get_response_with_history(
     user_input: str, 
     conversation_history: List[Message] = None, 
@@ -77,51 +259,24 @@ async def get_response_with_history(
     if not user_input.strip() and not image_file:
         return "Well you're awfully silent.", conversation_history or []
     
+    # Answer trivial text-only messages locally, but only to open a conversation:
+    # mid-conversation, "ok" or "thanks" may be answering the model's question
+    quick_reply = None if image_file or conversation_history else get_quick_reply(user_input)
+    if quick_reply:
+        return quick_reply, (conversation_history or []) + [
+            {"role": "user", "content": user_input},
+            {"role": "assistant", "content": quick_reply},
+        ]
+    
     try:
-        # Start with system message
-        messages = [{"role": "system", "content": "You are a helpful assistant."}]
-        
-        # Add conversation history if provided
-        if conversation_history:
-            messages.extend(conversation_history)
-        
-        # Add current user message
-        if image_file and image_format:
-            image_data_url = get_image_data_url(image_file, image_format)
-            if not image_data_url:
-                return "Could not read the image file.", conversation_history or []
-                
-            # Process with image
-            print(f"Generating AI response for image and text with history: {user_input[:30] if user_input else ''}...")
-            
-            # Add user message with image
-            messages.append({
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": user_input or "What's in this image?",
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": image_data_url,
-                            "detail": "low"
-                        },
-                    },
-                ]
-            })
-            
-            # Create a text-only version of the message for history
-            user_message = {"role": "user", "content": user_input or "What's in this image? [Image attached]"}
-        else:
-            # Process text only
-            print(f"Generating AI response for text input with history: {user_input[:30]}...")
-            user_message = {"role": "user", "content": user_input}
-            messages.append(user_message)
+        built = await build_messages(user_input, conversation_history, image_file, image_format)
+        if built is None:
+            return "Could not read the image file.", conversation_history or []
+        messages, user_message = built
+        logger.info(f"Generating AI response with history: {user_input[:30] if user_input else '[image]'}...")
         
         # Call the API
-        response = ai_client.chat.completions.create(
+        response = await ai_client.chat.completions.create(
             messages=messages,
             model=model_name,
             temperature=1,
@@ -146,20 +301,15 @@ async def get_response_with_history(
                 return response_text, new_history
                 
         # Handle unexpected response format
-        print("Received unexpected response format from API")
+        logger.error("Received unexpected response format from API")
         return "I couldn't generate a proper response. Please try again.", conversation_history or []
         
     except Exception as e:
         # Log the full error for debugging
-        print(f"AI API exception occurred: {e}")
-        traceback.print_exc()
+        logger.exception(f"AI API exception occurred: {e}")
         
         # Return a fallback response and unchanged history
-        fallback = choice([
-            "I don't know what you mean by that.",
-            "I don't understand.",
-            "I'm sorry, I don't know what you mean."
-        ])
+        fallback = choice(FALLBACK_RESPONSES)
         return fallback, conversation_history or []
 
 async def stream_response_with_history(
@@ -184,53 +334,27 @@ async def stream_response_with_history(
     if not user_input.strip() and not image_file:
         yield "Well you're awfully silent.", conversation_history or []
         return
+    
+    # Answer trivial text-only messages locally, but only to open a conversation:
+    # mid-conversation, "ok" or "thanks" may be answering the model's question
+    quick_reply = None if image_file or conversation_history else get_quick_reply(user_input)
+    if quick_reply:
+        yield quick_reply, (conversation_history or []) + [
+            {"role": "user", "content": user_input},
+            {"role": "assistant", "content": quick_reply},
+        ]
+        return
 
     try:
-        # Start with system message
-        messages = [{"role": "system", "content": "You are a helpful assistant."}]
-        
-        # Add conversation history if provided
-        if conversation_history:
-            messages.extend(conversation_history)
-        
-        # Add current user message
-        if image_file and image_format:
-            image_data_url = get_image_data_url(image_file, image_format)
-            if not image_data_url:
-                yield "Could not read the image file.", conversation_history or []
-                return
-                
-            # Process with image
-            print(f"Streaming AI response for image and text with history: {user_input[:30] if user_input else ''}...")
-            
-            # Add user message with image
-            messages.append({
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": user_input or "What's in this image?",
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": image_data_url,
-                            "detail": "low"
-                        },
-                    },
-                ]
-            })
-            
-            # Create a text-only version of the message for history
-            user_message = {"role": "user", "content": user_input or "What's in this image? [Image attached]"}
-        else:
-            # Process text only
-            print(f"Streaming AI response for text input with history: {user_input[:30]}...")
-            user_message = {"role": "user", "content": user_input}
-            messages.append(user_message)
+        built = await build_messages(user_input, conversation_history, image_file, image_format)
+        if built is None:
+            yield "Could not read the image file.", conversation_history or []
+            return
+        messages, user_message = built
+        logger.info(f"Streaming AI response with history: {user_input[:30] if user_input else '[image]'}...")
         
         # Call the API with streaming enabled
-        response_stream = ai_client.chat.completions.create(
+        response_stream = await ai_client.chat.completions.create(
             messages=messages,
             model=model_name,
             temperature=1,
@@ -241,7 +365,7 @@ async def stream_response_with_history(
         
         # Process the streaming response
         full_response = ""
-        for chunk in response_stream:
+        async for chunk in response_stream:
             if chunk.choices and chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
                 full_response += content
@@ -263,15 +387,10 @@ async def stream_response_with_history(
                 
     except Exception as e:
         # Log the full error for debugging
-        print(f"AI API streaming exception occurred: {e}")
-        traceback.print_exc()
+        logger.exception(f"AI API streaming exception occurred: {e}")
         
         # Return a fallback response and unchanged history
-        fallback = choice([
-            "I don't know what you mean by that.",
-            "I don't understand.",
-            "I'm sorry, I don't know what you mean."
-        ])
+        fallback = choice(FALLBACK_RESPONSES)
         yield fallback, conversation_history or []
 
 # Keep original functions for backward compatibility
@@ -7,7 +7,7 @@ This is the entry point for the Discord bot that loads all cogs and starts the b
 import os
 import sys
 import asyncio
-import platform
+import logging
 
 # Third-party imports
 import discord
@@ -15,7 +15,9 @@ from discord.ext import commands
 
 # Local imports
 import config
-from utils import get_uptime, get_command_suggestion
+from utils import get_command_suggestion, get_platform_info, setup_logging, stop_logging
+
+logger = logging.getLogger(__name__)
 
 # --- Bot Setup ---
 intents = discord.Intents.default()
@@ -26,12 +28,13 @@ bot = commands.Bot(command_prefix=config.DEFAULT_PREFIX, intents=intents, help_c
 @bot.event
 async def on_ready():
     """Handle bot initialization when connection to Discord is established."""
-    print(f'{"="*50}')
-    print(f'Bot is online as {bot.user}')
-    print(f'Discord.py version: {discord.__version__}')
-    print(f'Python version: {platform.python_version()}')
-    print(f'Running on: {platform.system()} {platform.release()}')
-    print(f'{"="*50}')
+    logger.info(f'{"="*50}')
+    logger.info(f'Bot is online as {bot.user}')
+    logger.info(f'Discord.py version: {discord.__version__}')
+    python_version, platform_name = get_platform_info()
+    logger.info(f'Python version: {python_version}')
+    logger.info(f'Running on: {platform_name}')
+    logger.info(f'{"="*50}')
     
     # Set status
     activity = discord.Activity(type=discord.ActivityType.listening, name=f"{config.DEFAULT_PREFIX}help")
@@ -89,7 +92,7 @@ async def on_command_error(ctx, error):
     
     # Generic error handler
     else:
-        print(f"Unhandled error: {error}")
+        logger.error(f"Unhandled error: {error}")
         embed = discord.Embed(title="Error", color=config.COLORS['error'])
         embed.description = "An unexpected error occurred while processing your command."
         embed.add_field(name="Error Details", value=str(error)[:1024], inline=False)
@@ -102,13 +105,14 @@ async def load_extensions():
         if filename.endswith('.py') and not filename.startswith('_'):
             try:
                 await bot.load_extension(f'cogs.{filename[:-3]}')
-                print(f'Loaded extension: {filename[:-3]}')
+                logger.info(f'Loaded extension: {filename[:-3]}')
             except Exception as e:
-                print(f'Failed to load extension {filename[:-3]}: {e}')
+                logger.error(f'Failed to load extension {filename[:-3]}: {e}')
 
 # --- Main Entry Point ---
 async def main():
     """Main entry point for the bot."""
+    setup_logging()
     try:
         # Load cogs
         await load_extensions()
@@ -118,12 +122,15 @@ async def main():
         # Handle graceful shutdown
         await bot.close()
     except Exception as e:
-        print(f"Error: {e}")
+        logger.error(f"Error: {e}")
         # Check for common errors
         if not config.TOKEN:
-            print("ERROR: DISCORD_TOKEN is not set in your .env file")
+            logger.error("DISCORD_TOKEN is not set in your .env file")
         elif "improper token" in str(e).lower():
-            print("ERROR: Your Discord token appears to be invalid")
+            logger.error("Your Discord token appears to be invalid")
+    finally:
+        # Flush any queued log records before exiting
+        stop_logging()
 
 if __name__ == "__main__":
     # Setup asyncio for Windows if needed
@@ -4,39 +4,67 @@ AI Discord Bot - Music Controller
 This module handles the core music playback functionality using Wavelink/Lavalink.
 """
 import asyncio
+import logging
+import random
 import re
 import time
+from collections import OrderedDict, deque
+from itertools import islice
+from urllib.parse import urlparse
 from typing import List, Dict, Any, Optional, Callable, Coroutine
 import discord
 import wavelink
 from wavelink.ext import spotify
-from .spotify_client import SpotifyClient
+from .spotify_client import SpotifyClient, SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET
+
+logger = logging.getLogger(__name__)
+
+# Domains whose links are resolved as links rather than as search terms; any
+# subdomain (open.spotify.com, play.spotify.com, music.youtube.com...) matches
+_SPOTIFY_DOMAINS = ("spotify.com",)
+_YOUTUBE_DOMAINS = ("youtube.com", "youtu.be")
+
+def _host_matches(host: str, domains: tuple) -> bool:
+    """Check whether a hostname is one of the given domains or a subdomain of one."""
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
 
 class Track:
     """Represents a playable track with metadata."""
     
+    __slots__ = ("track", "requester", "start_time")
+    
     def __init__(self, wavelink_track, requester=None):
         """Initialize a track with its wavelink track and requester."""
         self.track = wavelink_track
         self.requester = requester
-        self.start_time = 0
+        self.start_time = None  # Monotonic timestamp when playback started
         
     @property
     def is_playing(self) -> bool:
         """Check if the track is currently playing."""
-        return self.start_time > 0
+        return self.start_time is not None
+        
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the track started playing (0 if not playing)."""
+        return time.monotonic() - self.start_time if self.start_time is not None else 0.0
         
     def mark_playing(self) -> None:
         """Mark the track as playing now."""
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
 
 class GuildMusicController:
     """Controls music playback for a specific guild."""
     
+    __slots__ = (
+        "guild_id", "queue", "current_track", "volume", "loop",
+        "_disconnect_task", "_disconnect_timeout"
+    )
+    
     def __init__(self, guild_id: int):
         """Initialize the music controller for a guild."""
         self.guild_id = guild_id
-        self.queue = []  # List of Track objects
+        self.queue = deque()  # Deque of Track objects
         self.current_track = None  # Current Track
         self.volume = 100  # Default volume (0-1000)
         self.loop = False  # Repeat current track
@@ -51,7 +79,7 @@ class GuildMusicController:
     @property
     def is_empty(self) -> bool:
         """Check if queue is empty and nothing is playing."""
-        return len(self.queue) == 0 and not self.is_playing
+        return not self.queue and not self.is_playing
         
     def add_track(self, track, requester=None) -> Track:
         """Add a track to the queue."""
@@ -72,16 +100,22 @@ class GuildMusicController:
         self.current_track = None
         if not self.queue:
             return None
-        return self.queue.pop(0)
+        return self.queue.popleft()
         
     def clear_queue(self) -> None:
         """Clear the entire queue."""
-        self.queue = []
+        self.queue.clear()
         
     def shuffle(self) -> None:
         """Shuffle the queue."""
-        import random
-        random.shuffle(self.queue)
+        # Shuffle a list copy; indexing into the middle of a deque is O(n)
+        tracks = list(self.queue)
+        random.shuffle(tracks)
+        self.queue = deque(tracks)
+        
+    def peek(self, count: int) -> List[Track]:
+        """Return up to the first `count` queued tracks without removing them."""
+        return list(islice(self.queue, count))
         
     def cancel_disconnect(self) -> None:
         """Cancel the scheduled disconnect."""
@@ -99,13 +133,20 @@ class GuildMusicController:
         async def disconnect_task():
             await asyncio.sleep(timeout)
             await player.disconnect()
-            print(f"Automatically disconnected from guild {self.guild_id} due to inactivity")
+            logger.info(f"Automatically disconnected from guild {self.guild_id} due to inactivity")
             
         self._disconnect_task = asyncio.create_task(disconnect_task())
 
 class MusicService:
     """Global service for managing music playback across guilds."""
     
+    # Maximum number of YouTube searches in flight when resolving Spotify links
+    SEARCH_CONCURRENCY = 10
+    
+    # Bounded cache of search query -> track, shared by all guilds
+    SEARCH_CACHE_SIZE = 4096
+    SEARCH_CACHE_TTL = 24 * 60 * 60  # Re-search after a day in case videos are removed
+    
     def __init__(self, bot, lavalink_host, lavalink_port, lavalink_password):
         """Initialize the music service with Lavalink connection details."""
         self.bot = bot
@@ -113,13 +154,22 @@ class MusicService:
         self.lavalink_port = lavalink_port
         self.lavalink_password = lavalink_password
         self.controllers = {}  # guild_id -> GuildMusicController
-        self.spotify_client = SpotifyClient()
+        self._spotify_client = None  # Created on first Spotify link
+        self._search_cache = OrderedDict()  # query -> (cached_at, wavelink.Track)
+        
+    @property
+    def spotify_client(self) -> SpotifyClient:
+        """Get the Spotify client, creating it on first use."""
+        if self._spotify_client is None:
+            self._spotify_client = SpotifyClient()
+        return self._spotify_client
         
     def get_controller(self, guild_id: int) -> GuildMusicController:
         """Get or create a music controller for a guild."""
-        if guild_id not in self.controllers:
-            self.controllers[guild_id] = GuildMusicController(guild_id)
-        return self.controllers[guild_id]
+        controller = self.controllers.get(guild_id)
+        if controller is None:
+            controller = self.controllers[guild_id] = GuildMusicController(guild_id)
+        return controller
         
     async def setup(self) -> None:
         """Set up the wavelink client and connect to Lavalink server."""
@@ -130,43 +180,72 @@ class MusicService:
             port=self.lavalink_port,
             password=self.lavalink_password,
             spotify_client=spotify.SpotifyClient(
-                client_id=SpotifyClient.SPOTIFY_CLIENT_ID,
-                client_secret=SpotifyClient.SPOTIFY_CLIENT_SECRET
+                client_id=SPOTIFY_CLIENT_ID,
+                client_secret=SPOTIFY_CLIENT_SECRET
             )
         )
             
     async def search_track(self, query: str) -> Optional[wavelink.Track]:
-        """Search for a track on YouTube."""
+        """Search for a track on YouTube, reusing recent results for the same query."""
+        cached = self._search_cache.get(query)
+        if cached:
+            cached_at, track = cached
+            if time.monotonic() - cached_at < self.SEARCH_CACHE_TTL:
+                self._search_cache.move_to_end(query)
+                return track
+            del self._search_cache[query]
+            
         tracks = await wavelink.YouTubeTrack.search(query=query)
         if not tracks:
             return None
-        return tracks[0]
+            
+        track = tracks[0]
+        self._search_cache[query] = (time.monotonic(), track)
+        if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return track
     
     async def get_tracks_from_url(self, url: str, ctx=None) -> List[wavelink.Track]:
         """Get tracks from a URL (Spotify or direct YouTube URL)."""
-        if "spotify.com" in url:
+        # Pasted links often lack a scheme, without which urlparse finds no host
+        host = urlparse(url if "://" in url else f"https://{url}").hostname or ""
+        
+        if _host_matches(host, _SPOTIFY_DOMAINS):
             # Handle Spotify URL
-            spotify_tracks = self.spotify_client.get_tracks_from_url(url)
-            tracks = []
+            spotify_tracks = await self.spotify_client.get_tracks_from_url(url)
             
             if ctx:
                 await ctx.send(f"Found {len(spotify_tracks)} tracks in the Spotify link. This may take a moment to process...")
+            
+            # Run the YouTube searches concurrently, bounded to avoid hammering Lavalink
+            semaphore = asyncio.Semaphore(self.SEARCH_CONCURRENCY)
+            
+            async def search_one(index: int, query: str):
+                async with semaphore:
+                    try:
+                        return index, await self.search_track(query)
+                    except Exception as e:
+                        logger.error(f"Error searching for '{query}': {e}")
+                        return index, None
+            
+            searches = [
+                search_one(i, track_data['search_query'])
+                for i, track_data in enumerate(spotify_tracks)
+            ]
+            
+            # Collect results as they finish, keeping the playlist order
+            results = [None] * len(spotify_tracks)
+            for completed, future in enumerate(asyncio.as_completed(searches), start=1):
+                index, track = await future
+                results[index] = track
                 
-            for i, track_data in enumerate(spotify_tracks):
-                query = track_data['search_query']
-                track = await self.search_track(query)
-                
-                if track:
-                    # Add artist and title metadata from Spotify
-                    tracks.append(track)
-                    
                 # Give updates for long playlists
-                if ctx and i > 0 and i % 10 == 0:
-                    await ctx.send(f"Processed {i}/{len(spotify_tracks)} tracks...")
+                if ctx and completed % 10 == 0 and completed < len(spotify_tracks):
+                    await ctx.send(f"Processed {completed}/{len(spotify_tracks)} tracks...")
                     
-            return tracks
+            return [track for track in results if track]
             
-        elif "youtube.com" in url or "youtu.be" in url:
+        elif _host_matches(host, _YOUTUBE_DOMAINS):
             # Handle YouTube URL directly
             tracks = await wavelink.YouTubeTrack.search(url)
             return tracks if isinstance(tracks, list) else [tracks]
@@ -208,10 +287,10 @@ class MusicService:
         if controller.loop and controller.current_track:
             next_track = controller.current_track
             # Reset playing status for accurate tracking
-            controller.current_track.start_time = 0
+            controller.current_track.start_time = None
         else:
             if controller.queue:
-                next_track = controller.queue.pop(0)
+                next_track = controller.queue.popleft()
             controller.current_track = next_track
             
         # Play the track if we have one
@@ -3,19 +3,27 @@ AI Discord Bot - Spotify API Client
 
 This module handles Spotify API interactions, primarily extracting tracks from playlists.
 """
-import os
 import re
-from typing import List, Dict, Any, Optional
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Spotify credentials, read from the environment once by the config module
+from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET
 
-# Spotify credentials from environment variables
-SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+logger = logging.getLogger(__name__)
+
+# Precompiled URL pattern capturing the resource type and ID in one scan. Any
+# spotify.com subdomain is accepted, with or without a scheme, matching the
+# hosts the music controller treats as Spotify links
+_SPOTIFY_URL_RE = re.compile(r'(?:[\w-]+\.)?spotify\.com/(playlist|album|track)/([a-zA-Z0-9]+)')
+
+# Shared worker pool for spotipy, which only offers blocking calls
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="spotify")
 
 class SpotifyClient:
     """Client for interacting with the Spotify API."""
@@ -25,93 +33,124 @@ class SpotifyClient:
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             raise ValueError("Spotify API credentials not found in environment variables")
             
-        self.spotify = spotipy.Spotify(
-            auth_manager=SpotifyClientCredentials(
-                client_id=SPOTIFY_CLIENT_ID,
-                client_secret=SPOTIFY_CLIENT_SECRET
+        self._spotify = None
+    
+    @property
+    def spotify(self) -> spotipy.Spotify:
+        """The underlying spotipy client, created on first API call."""
+        if self._spotify is None:
+            self._spotify = spotipy.Spotify(
+                auth_manager=SpotifyClientCredentials(
+                    client_id=SPOTIFY_CLIENT_ID,
+                    client_secret=SPOTIFY_CLIENT_SECRET
+                )
             )
-        )
+        return self._spotify
+    
+    @staticmethod
+    def parse_url(url: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Parse a Spotify URL into its resource type and ID.
+        
+        Args:
+            url: Spotify URL (playlist, album, or track)
+            
+        Returns:
+            A (type, id) tuple, or (None, None) if this isn't a Spotify URL
+        """
+        match = _SPOTIFY_URL_RE.search(url)
+        return (match.group(1), match.group(2)) if match else (None, None)
     
     @staticmethod
     def is_spotify_url(url: str) -> bool:
         """Check if the given URL is a Spotify URL."""
-        return bool(re.match(r'https?://open\.spotify\.com/(playlist|album|track)', url))
+        return SpotifyClient.parse_url(url)[0] is not None
     
     @staticmethod
     def extract_spotify_id(url: str) -> Optional[str]:
         """Extract Spotify ID from a Spotify URL."""
-        match = re.search(r'spotify\.com/(?:playlist|album|track)/([a-zA-Z0-9]+)', url)
-        return match.group(1) if match else None
+        return SpotifyClient.parse_url(url)[1]
     
     @staticmethod
     def get_spotify_type(url: str) -> Optional[str]:
         """Get the Spotify resource type (playlist, album, track) from URL."""
-        match = re.search(r'spotify\.com/(playlist|album|track)', url)
-        return match.group(1) if match else None
+        return SpotifyClient.parse_url(url)[0]
+    
+    @staticmethod
+    def format_track(track: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Spotify track object into the track data used for searching."""
+        artist = track['artists'][0]['name'] if track['artists'] else None
+        return {
+            'name': track['name'],
+            'artist': artist or 'Unknown',
+            'duration': track['duration_ms'],
+            'search_query': f"{track['name']} {artist or ''}"
+        }
     
-    def get_playlist_tracks(self, playlist_url: str) -> List[Dict[str, Any]]:
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking spotipy call on the shared thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    
+    async def get_playlist_tracks(self, playlist_id: str) -> List[Dict[str, Any]]:
         """
         Get tracks from a Spotify playlist.
         
+        The first page reports the playlist size; the remaining pages are then
+        fetched concurrently instead of one round-trip at a time.
+        
         Args:
-            playlist_url: Spotify playlist URL
+            playlist_id: Spotify playlist ID
             
         Returns:
             List of track data with name, artists, and duration
         """
-        playlist_id = self.extract_spotify_id(playlist_url)
-        if not playlist_id:
-            return []
-            
-        results = []
-        offset = 0
         limit = 100  # Maximum allowed by Spotify API
         
-        while True:
-            response = self.spotify.playlist_tracks(
-                playlist_id, 
-                offset=offset,
-                limit=limit,
-                fields='items(track(name,artists(name),duration_ms)),total'
-            )
-            
-            if not response or 'items' not in response:
-                break
-                
-            items = response['items']
-            if not items:
-                break
-                
-            for item in items:
-                if 'track' in item and item['track']:
-                    track = item['track']
-                    results.append({
-                        'name': track['name'],
-                        'artist': track['artists'][0]['name'] if track['artists'] else 'Unknown',
-                        'duration': track['duration_ms'],
-                        'search_query': f"{track['name']} {track['artists'][0]['name'] if track['artists'] else ''}"
-                    })
+        first_page = await self._run_blocking(
+            self.spotify.playlist_tracks,
+            playlist_id,
+            offset=0,
+            limit=limit,
+            fields='items(track(name,artists(name),duration_ms)),total'
+        )
+        
+        if not first_page or 'items' not in first_page:
+            return []
             
-            offset += len(items)
-            if len(results) >= response.get('total', 0):
-                break
-                
-        return results
+        pages = [first_page]
+        total = first_page.get('total', 0)
+        
+        if total > limit:
+            pages += await asyncio.gather(*[
+                self._run_blocking(
+                    self.spotify.playlist_tracks,
+                    playlist_id,
+                    offset=offset,
+                    limit=limit,
+                    fields='items(track(name,artists(name),duration_ms))'
+                )
+                for offset in range(limit, total, limit)
+            ])
+        
+        # Flatten the pages in one pass, skipping unavailable (null) tracks
+        return [
+            self.format_track(item['track'])
+            for page in pages if page
+            for item in page.get('items') or ()
+            if item.get('track')
+        ]
     
-    def get_album_tracks(self, album_url: str) -> List[Dict[str, Any]]:
+    def get_album_tracks(self, album_id: str) -> List[Dict[str, Any]]:
         """
         Get tracks from a Spotify album.
         
         Args:
-            album_url: Spotify album URL
+            album_id: Spotify album ID
             
         Returns:
             List of track data with name, artists, and duration
         """
-        album_id = self.extract_spotify_id(album_url)
-        if not album_id:
-            return []
-            
         results = []
         
         try:
@@ -120,52 +159,37 @@ class SpotifyClient:
             if not response or 'items' not in response:
                 return []
                 
-            for track in response['items']:
-                results.append({
-                    'name': track['name'],
-                    'artist': track['artists'][0]['name'] if track['artists'] else 'Unknown',
-                    'duration': track['duration_ms'],
-                    'search_query': f"{track['name']} {track['artists'][0]['name'] if track['artists'] else ''}"
-                })
+            results = [self.format_track(track) for track in response['items']]
                 
         except Exception as e:
-            print(f"Error fetching album tracks: {e}")
+            logger.error(f"Error fetching album tracks: {e}")
             
         return results
     
-    def get_track_info(self, track_url: str) -> Optional[Dict[str, Any]]:
+    def get_track_info(self, track_id: str) -> Optional[Dict[str, Any]]:
         """
         Get info for a single Spotify track.
         
         Args:
-            track_url: Spotify track URL
+            track_id: Spotify track ID
             
         Returns:
             Track data with name, artists, and duration
         """
-        track_id = self.extract_spotify_id(track_url)
-        if not track_id:
-            return None
-            
         try:
             track = self.spotify.track(track_id)
             
             if not track:
                 return None
                 
-            return {
-                'name': track['name'],
-                'artist': track['artists'][0]['name'] if track['artists'] else 'Unknown',
-                'duration': track['duration_ms'],
-                'search_query': f"{track['name']} {track['artists'][0]['name'] if track['artists'] else ''}"
-            }
+            return self.format_track(track)
             
         except Exception as e:
-            print(f"Error fetching track info: {e}")
+            logger.error(f"Error fetching track info: {e}")
             
         return None
         
-    def get_tracks_from_url(self, url: str) -> List[Dict[str, Any]]:
+    async def get_tracks_from_url(self, url: str) -> List[Dict[str, Any]]:
         """
         Get tracks from any Spotify URL (playlist, album, or track).
         
@@ -175,17 +199,14 @@ class SpotifyClient:
         Returns:
             List of track data
         """
-        if not self.is_spotify_url(url):
-            return []
-            
-        resource_type = self.get_spotify_type(url)
+        resource_type, resource_id = self.parse_url(url)
         
         if resource_type == 'playlist':
-            return self.get_playlist_tracks(url)
+            return await self.get_playlist_tracks(resource_id)
         elif resource_type == 'album':
-            return self.get_album_tracks(url)
+            return await self._run_blocking(self.get_album_tracks, resource_id)
         elif resource_type == 'track':
-            track = self.get_track_info(url)
+            track = await self._run_blocking(self.get_track_info, resource_id)
             return [track] if track else []
         
         return []
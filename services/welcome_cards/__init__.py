@@ -4,7 +4,9 @@ Welcome Cards package.
 This package handles welcome card generation and background management.
 """
 # Import and expose the main functions for external use
-from .card_gen import create_welcome_card, create_welcome_embed
+from .card_gen import create_welcome_card, create_welcome_embed, warm_up_welcome_cards
+from .config import CARD_FILENAME
+from .image_utils import close_session as close_download_session
 from .backgrounds import (
     add_background, remove_background, set_default_background,
     list_backgrounds, create_background_preview,
@@ -13,7 +15,8 @@ from .backgrounds import (
 
 # Define what gets imported with "from services.welcome_cards import *"
 __all__ = [
-    'create_welcome_card', 'create_welcome_embed',
+    'create_welcome_card', 'create_welcome_embed', 'warm_up_welcome_cards', 'CARD_FILENAME',
+    'close_download_session',
     'add_background', 'remove_background', 'set_default_background',
     'list_backgrounds', 'create_background_preview',
     'get_backgrounds_config', 'get_default_background', 'get_random_background'
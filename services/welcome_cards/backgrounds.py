@@ -8,48 +8,163 @@ import io
 import json
 import random
 import asyncio
-import tempfile
-import traceback
+import logging
+import threading
 from typing import List, Dict, Any, Optional
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from . import config as cfg
-from .image_utils import download_image, resize_image
+from .image_utils import (
+    download_image, resize_image, get_font, ensure_rgba, open_image, apply_card_gradient, run_render
+)
+
+logger = logging.getLogger(__name__)
+
+# Use orjson to read the config file when it's installed; it parses bytes directly
+try:
+    import orjson
+
+    def _loads_config(data: bytes) -> Dict[str, Any]:
+        return orjson.loads(data)
+except ImportError:
+    def _loads_config(data: bytes) -> Dict[str, Any]:
+        return json.loads(data)
+
+def _dumps_config(config: Dict[str, Any]) -> bytes:
+    # Always written by json, so the hand-edited file keeps the same 4-space
+    # layout whether or not orjson is installed (orjson can only indent by 2)
+    return json.dumps(config, indent=4).encode()
+
+# Parsed backgrounds config (and its background names), reused until the file's mtime changes
+_config_cache: Dict[str, Any] = {"mtime": None, "data": None, "names": ()}
+
+# The config is read from render worker threads as well as the event loop.
+# Reentrant, since loading may create (save) a default config
+_config_lock = threading.RLock()
+
+# Decoded, card-sized RGBA backgrounds keyed by file path
+_prepared_backgrounds: Dict[str, Image.Image] = {}
+
+# The same backgrounds with the card gradient baked in, keyed by file path
+_composited_backgrounds: Dict[str, Image.Image] = {}
+
+# Per-channel lookup table that darkens RGB the same way as a black overlay
+# with alpha 110 would, leaving alpha untouched
+_PREVIEW_DARKEN_LUT = [value * (255 - 110) // 255 for value in range(256)] * 3 + list(range(256))
 
 def get_backgrounds_config() -> Dict[str, Any]:
     """
     Load the backgrounds configuration file or create default if not exists.
     
+    The parsed config is cached and only re-read when the file changes on disk.
+    The returned dict is shared, so treat it as read-only; to change the config,
+    edit the copy from _copy_config and pass it to save_backgrounds_config.
+    
     Returns:
         Dict: The background configuration dictionary.
     """
-    if os.path.exists(cfg.BACKGROUNDS_CONFIG):
+    with _config_lock:
         try:
-            with open(cfg.BACKGROUNDS_CONFIG, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading backgrounds config: {e}")
-    
-    # Create default config if not exists
-    default_config = {
-        "default_background": None,
-        "backgrounds": {}
-    }
-    save_backgrounds_config(default_config)
-    return default_config
+            mtime = os.stat(cfg.BACKGROUNDS_CONFIG).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        if mtime is not None:
+            if _config_cache["mtime"] == mtime:
+                return _config_cache["data"]
+            
+            try:
+                with open(cfg.BACKGROUNDS_CONFIG, 'rb') as f:
+                    config = _loads_config(f.read())
+                _config_cache.update(mtime=mtime, data=config, names=tuple(sorted(config["backgrounds"])))
+                return config
+            except Exception as e:
+                logger.error(f"Error loading backgrounds config: {e}")
+        
+        # Create default config if not exists
+        default_config = {
+            "default_background": None,
+            "backgrounds": {}
+        }
+        save_backgrounds_config(default_config)
+        return default_config
 
-def save_backgrounds_config(config: Dict[str, Any]) -> None:
+def _copy_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a backgrounds config so it can be edited without touching the cached one.
+    
+    Args:
+        config: The configuration dictionary to copy.
+        
+    Returns:
+        Dict: A copy with its own backgrounds mapping.
+    """
+    return {**config, "backgrounds": dict(config["backgrounds"])}
+
+def save_backgrounds_config(config: Dict[str, Any]) -> bool:
     """
     Save the backgrounds configuration to file.
     
+    The file is written to a temporary path and then swapped in, so a reader
+    never sees a half-written config. The cached config is only replaced once
+    the new file is in place.
+    
     Args:
         config: The configuration dictionary to save.
+        
+    Returns:
+        True if the config was saved, False otherwise
     """
+    temp_path = f"{cfg.BACKGROUNDS_CONFIG}.tmp"
     try:
-        with open(cfg.BACKGROUNDS_CONFIG, 'w') as f:
-            json.dump(config, f, indent=4)
+        with _config_lock:
+            with open(temp_path, 'wb') as f:
+                f.write(_dumps_config(config))
+            os.replace(temp_path, cfg.BACKGROUNDS_CONFIG)
+            _config_cache.update(
+                mtime=os.stat(cfg.BACKGROUNDS_CONFIG).st_mtime_ns,
+                data=config,
+                names=tuple(sorted(config["backgrounds"]))
+            )
+        return True
     except Exception as e:
-        print(f"Error saving backgrounds config: {e}")
+        logger.error(f"Error saving backgrounds config: {e}")
+        return False
+
+def _store_background_image(image_data: bytes, file_path: str) -> bool:
+    """
+    Decode an image, resize it to card dimensions and save it as PNG (blocking).
+    
+    Args:
+        image_data: The encoded image bytes
+        file_path: Where to save the resized background
+        
+    Returns:
+        True if the background was saved, False otherwise
+    """
+    # Decode straight from memory, letting large JPEGs downscale during decode
+    try:
+        image = open_image(image_data, (cfg.CARD_WIDTH, cfg.CARD_HEIGHT))
+        logger.info(f"Opened image: {image.width}x{image.height}")
+    except Exception as e:
+        logger.exception(f"Failed to open image: {e}")
+        return False
+    
+    # Process and save the image
+    try:
+        # Resize to standard dimensions for consistency
+        logger.info(f"Resizing image to {cfg.CARD_WIDTH}x{cfg.CARD_HEIGHT}...")
+        image = resize_image(image, cfg.CARD_WIDTH, cfg.CARD_HEIGHT)
+        logger.info("Resizing successful")
+        
+        # Save the image
+        logger.info(f"Saving image to {file_path}")
+        image.save(file_path, "PNG")
+        logger.info("Image saved successfully")
+        return True
+    except Exception as e:
+        logger.exception(f"Error processing image: {e}")
+        return False
 
 async def add_background(name: str, url: str = None, attachment_data: bytes = None) -> bool:
     """
@@ -63,107 +178,45 @@ async def add_background(name: str, url: str = None, attachment_data: bytes = No
     Returns:
         True if adding was successful, False otherwise
     """
-    print(f"Adding background '{name}' - URL provided: {bool(url)}, Attachment provided: {bool(attachment_data)}")
+    logger.info(f"Adding background '{name}' - URL provided: {bool(url)}, Attachment provided: {bool(attachment_data)}")
     
     # Ensure backgrounds directory exists
     os.makedirs(cfg.BACKGROUNDS_DIR, exist_ok=True)
     
-    config = get_backgrounds_config()
-    
     # Check if name already exists
-    if name in config["backgrounds"]:
-        print(f"Background with name '{name}' already exists")
+    if name in get_backgrounds_config()["backgrounds"]:
+        logger.warning(f"Background with name '{name}' already exists")
         return False
     
     file_path = f"{cfg.BACKGROUNDS_DIR}/{name}.png"
-    temp_file = None
     
     try:
         # Get image data
         image_data = None
         if url:
-            print(f"Downloading image from URL: {url}")
+            logger.info(f"Downloading image from URL: {url}")
             image_data = await download_image(url)
             if not image_data:
-                print("Failed to download image from URL")
+                logger.error("Failed to download image from URL")
                 return False
             
-            print(f"Successfully downloaded {len(image_data)} bytes")
-            
-            # For large images, use a temporary file to avoid memory issues
-            if len(image_data) > 5 * 1024 * 1024:  # If larger than 5MB
-                print("Large image detected, using temporary file")
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.img')
-                temp_file.write(image_data)
-                temp_file.close()
-                
-                # Open image from the temp file
-                try:
-                    image = Image.open(temp_file.name).convert("RGBA")
-                    print(f"Opened large image from temp file: {image.width}x{image.height}")
-                except Exception as e:
-                    print(f"Failed to open large image: {e}")
-                    traceback.print_exc()
-                    return False
-            else:
-                # Use BytesIO for smaller images
-                image_stream = io.BytesIO(image_data)
-                image_stream.seek(0)
-                
-                try:
-                    image = Image.open(image_stream).convert("RGBA")
-                    print(f"Opened image from BytesIO: {image.width}x{image.height}")
-                except Exception as e:
-                    print(f"Failed to open image from BytesIO: {e}")
-                    traceback.print_exc()
-                    return False
+            logger.info(f"Successfully downloaded {len(image_data)} bytes")
         elif attachment_data:
-            print(f"Processing attachment data of {len(attachment_data)} bytes")
-            
-            # For large attachments, use a temporary file
-            if len(attachment_data) > 5 * 1024 * 1024:  # If larger than 5MB
-                print("Large attachment detected, using temporary file")
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.img')
-                temp_file.write(attachment_data)
-                temp_file.close()
-                
-                # Open image from the temp file
-                try:
-                    image = Image.open(temp_file.name).convert("RGBA")
-                    print(f"Opened large attachment from temp file: {image.width}x{image.height}")
-                except Exception as e:
-                    print(f"Failed to open large attachment: {e}")
-                    traceback.print_exc()
-                    return False
-            else:
-                # Use BytesIO for smaller attachments
-                image_stream = io.BytesIO(attachment_data)
-                image_stream.seek(0)
-                
-                try:
-                    image = Image.open(image_stream).convert("RGBA")
-                    print(f"Opened attachment from BytesIO: {image.width}x{image.height}")
-                except Exception as e:
-                    print(f"Failed to open attachment from BytesIO: {e}")
-                    traceback.print_exc()
-                    return False
+            logger.info(f"Processing attachment data of {len(attachment_data)} bytes")
+            image_data = attachment_data
         else:
-            print("No valid image data provided")
+            logger.warning("No valid image data provided")
+            return False
+        
+        # Decoding, resizing and PNG encoding are CPU-bound, so keep them off the event loop
+        if not await run_render(_store_background_image, image_data, file_path):
             return False
+        _prepared_backgrounds.pop(file_path, None)
+        _composited_backgrounds.pop(file_path, None)
         
-        # Process and save the image    
         try:
-            # Resize to standard dimensions for consistency
-            print(f"Resizing image to {cfg.CARD_WIDTH}x{cfg.CARD_HEIGHT}...")
-            image = resize_image(image, cfg.CARD_WIDTH, cfg.CARD_HEIGHT)
-            print("Resizing successful")
-            
-            # Save the image
-            print(f"Saving image to {file_path}")
-            image.save(file_path, "PNG")
-            print("Image saved successfully")
-            
-            # Update config
+            # Update a copy of the config, re-read now that the image is stored
+            config = _copy_config(get_backgrounds_config())
             config["backgrounds"][name] = {
                 "path": file_path,
                 "added_at": str(asyncio.get_event_loop().time())
@@ -172,28 +225,19 @@ async def add_background(name: str, url: str = None, attachment_data: bytes = No
             # Set as default if it's the first background
             if not config["default_background"]:
                 config["default_background"] = name
-                print(f"Set '{name}' as default background")
+                logger.info(f"Set '{name}' as default background")
             
-            save_backgrounds_config(config)
-            print(f"Background '{name}' successfully added")
+            if not save_backgrounds_config(config):
+                return False
+            logger.info(f"Background '{name}' successfully added")
             return True
         except Exception as e:
-            print(f"Error processing image: {e}")
-            traceback.print_exc()
+            logger.exception(f"Error updating backgrounds config: {e}")
             return False
             
     except Exception as e:
-        print(f"Error adding background: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error adding background: {e}")
         return False
-    finally:
-        # Clean up any temporary files
-        if temp_file and os.path.exists(temp_file.name):
-            try:
-                os.unlink(temp_file.name)
-                print(f"Removed temporary file: {temp_file.name}")
-            except Exception as e:
-                print(f"Failed to remove temporary file: {e}")
 
 def remove_background(name: str) -> bool:
     """
@@ -205,36 +249,39 @@ def remove_background(name: str) -> bool:
     Returns:
         True if removal was successful, False otherwise
     """
-    config = get_backgrounds_config()
+    config = _copy_config(get_backgrounds_config())
     
     if name not in config["backgrounds"]:
-        print(f"Background '{name}' not found")
+        logger.warning(f"Background '{name}' not found")
         return False
     
     try:
-        # Delete the file
-        file_path = config["backgrounds"][name]["path"]
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
         # Update config
-        del config["backgrounds"][name]
+        file_path = config["backgrounds"].pop(name)["path"]
         
         # Update default if needed
         if config["default_background"] == name:
             if config["backgrounds"]:
                 new_default = next(iter(config["backgrounds"]))
                 config["default_background"] = new_default
-                print(f"Changed default background to '{new_default}'")
+                logger.info(f"Changed default background to '{new_default}'")
             else:
                 config["default_background"] = None
-                print("No backgrounds left, cleared default")
+                logger.info("No backgrounds left, cleared default")
+        
+        if not save_backgrounds_config(config):
+            return False
+        
+        # Delete the file only once the config no longer refers to it
+        _prepared_backgrounds.pop(file_path, None)
+        _composited_backgrounds.pop(file_path, None)
+        if os.path.exists(file_path):
+            os.remove(file_path)
         
-        save_backgrounds_config(config)
-        print(f"Background '{name}' successfully removed")
+        logger.info(f"Background '{name}' successfully removed")
         return True
     except Exception as e:
-        print(f"Error removing background: {e}")
+        logger.error(f"Error removing background: {e}")
         return False
 
 def set_default_background(name: str) -> bool:
@@ -247,22 +294,24 @@ def set_default_background(name: str) -> bool:
     Returns:
         True if setting default was successful, False otherwise
     """
-    config = get_backgrounds_config()
+    config = _copy_config(get_backgrounds_config())
     
     if not name:
         # Clear default
         config["default_background"] = None
-        save_backgrounds_config(config)
-        print("Default background cleared")
+        if not save_backgrounds_config(config):
+            return False
+        logger.info("Default background cleared")
         return True
     
     if name not in config["backgrounds"]:
-        print(f"Background '{name}' not found")
+        logger.warning(f"Background '{name}' not found")
         return False
     
     config["default_background"] = name
-    save_backgrounds_config(config)
-    print(f"Default background set to '{name}'")
+    if not save_backgrounds_config(config):
+        return False
+    logger.info(f"Default background set to '{name}'")
     return True
 
 def list_backgrounds() -> List[Dict[str, Any]]:
@@ -291,12 +340,18 @@ def get_random_background() -> Optional[str]:
     Returns:
         Path to a random background, or None if no backgrounds exist
     """
-    backgrounds = list_backgrounds()
-    if not backgrounds:
+    # Read the names and the config they were taken from together, so a save
+    # from another thread can't slip in between
+    with _config_lock:
+        config = get_backgrounds_config()
+        if _config_cache["data"] is config:
+            names = _config_cache["names"]
+        else:
+            names = tuple(sorted(config["backgrounds"]))
+    if not names:
         return None
     
-    bg = random.choice(backgrounds)
-    return bg["path"]
+    return config["backgrounds"][random.choice(names)]["path"]
 
 def get_default_background() -> Optional[str]:
     """
@@ -313,10 +368,97 @@ def get_default_background() -> Optional[str]:
     
     return None
 
+def load_prepared_background(path: str) -> Optional[Image.Image]:
+    """
+    Load a stored background as a card-sized RGBA image, decoding it only once.
+    
+    Callers must copy() the returned image before drawing on it.
+    
+    Args:
+        path: Path to the background image file
+        
+    Returns:
+        The cached background image, or None if it could not be loaded
+    """
+    background = _prepared_backgrounds.get(path)
+    if background is not None:
+        return background
+    
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        background = ensure_rgba(Image.open(path))
+        if background.size != (cfg.CARD_WIDTH, cfg.CARD_HEIGHT):
+            background = resize_image(background, cfg.CARD_WIDTH, cfg.CARD_HEIGHT)
+        background.load()
+    except Exception as e:
+        logger.error(f"Error loading background '{path}': {e}")
+        return None
+    
+    _prepared_backgrounds[path] = background
+    return background
+
+def load_composited_background(path: str) -> Optional[Image.Image]:
+    """
+    Load a stored background with the card gradient applied, compositing it only once.
+    
+    Callers must copy() the returned image before drawing on it.
+    
+    Args:
+        path: Path to the background image file
+        
+    Returns:
+        The cached composited background, or None if it could not be loaded
+    """
+    composited = _composited_backgrounds.get(path)
+    if composited is not None:
+        return composited
+    
+    background = load_prepared_background(path)
+    if background is None:
+        return None
+    
+    composited = background.copy()
+    apply_card_gradient(composited)
+    _composited_backgrounds[path] = composited
+    return composited
+
+def get_composited_background(name: str) -> Optional[Image.Image]:
+    """
+    Get a stored background by name, with the card gradient applied.
+    
+    Args:
+        name: Name of the background
+        
+    Returns:
+        The cached composited background, or None if it doesn't exist
+    """
+    config = get_backgrounds_config()
+    
+    if name not in config["backgrounds"]:
+        return None
+    
+    return load_composited_background(config["backgrounds"][name]["path"])
+
 async def create_background_preview(background_name: str) -> Optional[io.BytesIO]:
     """
     Create a preview image of a background.
     
+    Rendering and PNG encoding run in a worker thread to keep the event loop free.
+    
+    Args:
+        background_name: Name of the background to preview
+        
+    Returns:
+        BytesIO buffer containing the PNG preview, or None if creation failed
+    """
+    return await run_render(_render_background_preview, background_name)
+
+def _render_background_preview(background_name: str) -> Optional[io.BytesIO]:
+    """
+    Render and encode a background preview (blocking).
+    
     Args:
         background_name: Name of the background to preview
         
@@ -326,31 +468,25 @@ async def create_background_preview(background_name: str) -> Optional[io.BytesIO
     config = get_backgrounds_config()
     
     if background_name not in config["backgrounds"]:
-        print(f"Background '{background_name}' not found")
+        logger.warning(f"Background '{background_name}' not found")
         return None
     
     file_path = config["backgrounds"][background_name]["path"]
     
     try:
-        # Load background
-        background = Image.open(file_path).convert("RGBA")
-        
-        # Resize if needed
-        background = resize_image(background, cfg.CARD_WIDTH, cfg.CARD_HEIGHT)
+        # Load background (already card-sized)
+        background = load_prepared_background(file_path)
+        if background is None:
+            return None
         
-        # Add overlay to show how it would look
-        overlay = Image.new('RGBA', (cfg.CARD_WIDTH, cfg.CARD_HEIGHT), (0, 0, 0, 110))
-        preview = Image.alpha_composite(background, overlay)
+        # Darken to show how it would look under the card text (one pass, no overlay image)
+        preview = background.point(_PREVIEW_DARKEN_LUT)
         
         # Add text to show it's a preview
         draw = ImageDraw.Draw(preview)
         
-        try:
-            font = ImageFont.truetype(cfg.FONT_BOLD, 50) if cfg.FONT_BOLD else ImageFont.load_default()
-            small_font = ImageFont.truetype(cfg.FONT_REGULAR, 24) if cfg.FONT_REGULAR else ImageFont.load_default()
-        except Exception:
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
+        font = get_font(cfg.FONT_BOLD, 50)
+        small_font = get_font(cfg.FONT_REGULAR, 24)
             
         # Draw preview title
         center_x = cfg.CARD_WIDTH // 2
@@ -373,12 +509,14 @@ async def create_background_preview(background_name: str) -> Optional[io.BytesIO
                 anchor="mm"
             )
         
-        # Save to buffer
+        # Save to buffer; it's uploaded once and discarded, so favour a fast
+        # encode over a smaller file. The image is shown opaque, so drop the
+        # alpha channel and give the encoder a quarter less data
         buffer = io.BytesIO()
-        preview.save(buffer, format="PNG")
+        preview.convert("RGB").save(buffer, format="PNG", compress_level=1, optimize=False)
         buffer.seek(0)
         
         return buffer
     except Exception as e:
-        print(f"Error creating background preview: {e}")
+        logger.error(f"Error creating background preview: {e}")
         return None
@@ -4,52 +4,263 @@ AI Discord Bot - Welcome Card Generation Module
 This module handles the creation of welcome cards for new members.
 """
 # Standard library imports
-import os
 import io
+import math
+import asyncio
+import logging
+import functools
 import textwrap
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from typing import Tuple, Optional
 
-# Third-party imports
-from PIL import Image, ImageDraw, ImageFont
+# Third-party imports (Pillow-SIMD can be installed in place of Pillow for
+# faster resizes and composites; see the README)
+from PIL import Image, ImageDraw, features
 
 # Local imports
+from utils import ordinal_suffix
 from . import config as cfg
-from .image_utils import download_image, create_circular_image, resize_image
+from .image_utils import (
+    download_image, create_circular_image, get_circle_mask, resize_image, get_font,
+    open_image, ensure_rgba, apply_card_gradient, run_render
+)
 from .backgrounds import (
-    get_backgrounds_config, get_default_background, 
-    get_random_background
+    get_default_background, get_random_background,
+    get_composited_background, load_composited_background
 )
 
-async def process_avatar(
-    avatar_url: str, 
+logger = logging.getLogger(__name__)
+
+def _build_solid_background() -> Image.Image:
+    """
+    Build the fallback background: the dark card color with the gradient already applied.
+    
+    Returns:
+        A card-sized RGBA image
+    """
+    background = Image.new('RGBA', (cfg.CARD_WIDTH, cfg.CARD_HEIGHT), cfg.DARK_BG)
+    apply_card_gradient(background)
+    return background
+
+# Used whenever no background image is available; copy() before drawing on it
+_SOLID_BACKGROUND = _build_solid_background()
+
+# Username font sizes to try, largest first, and the width the name must fit in
+_USERNAME_FONT_SIZES = (cfg.USERNAME_FONT_SIZE, 56, 48, 40, 32)
+_USERNAME_MAX_WIDTH = cfg.CARD_WIDTH - 80
+
+# Text shadows are black at alpha 120: their coverage mask is scaled by this
+# table so the shadow blends into the card instead of leaving translucent pixels
+_SHADOW_ALPHA_LUT = [value * 120 // 255 for value in range(256)]
+
+def _pixel_bbox(bbox: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+    """
+    Round a text bounding box out to whole pixels.
+    
+    Pillow returns fractional edges for some layouts (e.g. centered multiline
+    text), which Image.new and paste don't accept.
+    
+    Args:
+        bbox: The (left, top, right, bottom) box from ImageDraw.textbbox
+        
+    Returns:
+        The smallest integer box that contains it
+    """
+    left, top, right, bottom = bbox
+    return math.floor(left), math.floor(top), math.ceil(right), math.ceil(bottom)
+
+@functools.lru_cache(maxsize=8)
+def _static_text_mask(
+    text: str, font_path: Optional[str], font_size: int, anchor: str
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Rasterize text that's the same on every card once, as a coverage mask.
+    
+    Args:
+        text: The text to rasterize
+        font_path: Path of the font, as passed to get_font
+        font_size: Font size in points
+        anchor: Pillow text anchor the text is positioned by
+        
+    Returns:
+        The 'L' mask and the offset of its top-left corner from the anchor point
+    """
+    font = get_font(font_path, font_size)
+    left, top, right, bottom = _pixel_bbox(ImageDraw.Draw(Image.new('L', (1, 1))).textbbox(
+        (0, 0), text, font=font, anchor=anchor
+    ))
+    mask = Image.new('L', (right - left, bottom - top))
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font, anchor=anchor)
+    return mask, (left, top)
+
+def _draw_decorations(card: Image.Image, accent_color: Tuple[int, int, int]) -> None:
+    """
+    Draw the accent-colored side bars onto a card, in place.
+    
+    Args:
+        card: The card-sized image to draw on
+        accent_color: RGB tuple for the decorations
+    """
+    # Add stylish side accent bars, filling the regions directly
+    accent_width = 6
+    card.paste(accent_color, (0, 0, accent_width + 1, cfg.CARD_HEIGHT))  # Left bar
+    card.paste(accent_color, (cfg.CARD_WIDTH - accent_width, 0, cfg.CARD_WIDTH, cfg.CARD_HEIGHT))  # Right bar
+
+def _draw_ornament(card: Image.Image, accent_color: Tuple[int, int, int]) -> None:
+    """
+    Stamp the "• • •" ornament at the bottom of a card, in place.
+    
+    It sits inside the member count box, so it must be drawn after the box.
+    
+    Args:
+        card: The card-sized image to draw on
+        accent_color: RGB tuple for the ornament
+    """
+    # Stamp the pre-rasterized glyphs
+    mask, (dx, dy) = _static_text_mask("• • •", cfg.FONT_REGULAR, cfg.MESSAGE_FONT_SIZE, "mm")
+    left, top = cfg.CARD_WIDTH // 2 + dx, cfg.CARD_HEIGHT - 40 + dy
+    card.paste(accent_color, (left, top, left + mask.width, top + mask.height), mask)
+
+@functools.lru_cache(maxsize=16)
+def _solid_template(accent_color: Tuple[int, int, int]) -> Image.Image:
+    """
+    Build the solid-color card template, side bars included, once per accent color.
+    
+    Callers must copy() the returned image before drawing on it.
+    
+    Args:
+        accent_color: RGB tuple for the decorations
+        
+    Returns:
+        The dark gradient background with the side bars drawn
+    """
+    template = _SOLID_BACKGROUND.copy()
+    _draw_decorations(template, accent_color)
+    return template
+
+# Discord's CDN can serve avatars pre-scaled to a power-of-two size; ask for
+# the smallest one that still covers the avatar on the card
+AVATAR_CDN_SIZE = 256
+_DISCORD_CDN_HOSTS = frozenset(("cdn.discordapp.com", "media.discordapp.net"))
+
+def _sized_avatar_url(avatar_url: str) -> str:
+    """
+    Ask Discord's CDN for an avatar no larger than the card needs.
+    
+    Args:
+        avatar_url: The avatar URL (non-Discord URLs are returned unchanged)
+        
+    Returns:
+        The URL with its size query parameter set to AVATAR_CDN_SIZE
+    """
+    parts = urlsplit(avatar_url)
+    if parts.hostname not in _DISCORD_CDN_HOSTS:
+        return avatar_url
+    
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "size"]
+    query.append(("size", str(AVATAR_CDN_SIZE)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+# Recently used URL backgrounds, resized and with the gradient applied.
+# Rendering runs in worker threads, so access goes through a lock
+URL_BACKGROUND_CACHE_SIZE = 8
+_url_backgrounds: "OrderedDict[str, Image.Image]" = OrderedDict()
+_url_backgrounds_lock = threading.Lock()
+
+def _get_url_background(url: str) -> Optional[Image.Image]:
+    """
+    Look up a cached URL background, marking it as recently used.
+    
+    Callers must copy() the returned image before drawing on it.
+    
+    Args:
+        url: The background URL
+        
+    Returns:
+        The cached background, or None if it isn't cached
+    """
+    with _url_backgrounds_lock:
+        background = _url_backgrounds.get(url)
+        if background is not None:
+            _url_backgrounds.move_to_end(url)
+        return background
+
+def _cache_url_background(url: str, background: Image.Image) -> None:
+    """
+    Store a prepared URL background, evicting the least recently used one if full.
+    
+    Args:
+        url: The background URL
+        background: The card-sized background with the gradient applied
+    """
+    with _url_backgrounds_lock:
+        _url_backgrounds[url] = background
+        _url_backgrounds.move_to_end(url)
+        if len(_url_backgrounds) > URL_BACKGROUND_CACHE_SIZE:
+            _url_backgrounds.popitem(last=False)
+
+@functools.lru_cache(maxsize=16)
+def _glow_sprite(accent_color: Tuple[int, int, int]) -> Image.Image:
+    """
+    Build the subtle glow drawn behind the avatar, once per accent color.
+    
+    Args:
+        accent_color: RGB tuple for the glow color
+        
+    Returns:
+        A transparent RGBA image, 20px wider than the avatar border, with a
+        faint accent-colored disc
+    """
+    glow_size = cfg.AVATAR_BORDER_SIZE + 20
+    glow = Image.new('RGBA', (glow_size, glow_size), (0, 0, 0, 0))
+    # ImageDraw replaces pixels rather than blending them, so stacking
+    # concentric translucent rings gives the same result as one disc
+    ImageDraw.Draw(glow).ellipse((1, 1, glow_size - 1, glow_size - 1), fill=(*accent_color, 6))
+    return glow
+
+@functools.lru_cache(maxsize=16)
+def _border_sprite(accent_color: Tuple[int, int, int]) -> Image.Image:
+    """
+    Build the circular avatar border for an accent color, once per color.
+    
+    Args:
+        accent_color: RGB tuple for the border color
+        
+    Returns:
+        A transparent RGBA image with a filled accent-colored circle
+    """
+    # A solid color needs no resampling, so just cut the circle out of it
+    border = Image.new('RGBA', (cfg.AVATAR_BORDER_SIZE, cfg.AVATAR_BORDER_SIZE), accent_color)
+    border.putalpha(get_circle_mask(cfg.AVATAR_BORDER_SIZE))
+    return border
+
+def process_avatar(
+    avatar_data: Optional[bytes], 
     username: str, 
     accent_color: Tuple[int, int, int]
 ) -> Image.Image:
     """
-    Process avatar image: download, create circular mask, and add border.
+    Process avatar image: decode it (or draw a placeholder) and cut it into a circle.
+    
+    The accent-colored border ring is a cached sprite pasted by the caller.
     
     Args:
-        avatar_url: URL of the avatar image
+        avatar_data: Downloaded avatar image bytes, or None if the download failed
         username: Username (used for placeholder if avatar can't be downloaded)
-        accent_color: RGB tuple for avatar border color
+        accent_color: RGB tuple for the placeholder background
         
     Returns:
-        Processed PIL Image with the avatar
+        Circular RGBA avatar of AVATAR_SIZE
     """
     avatar_size = cfg.AVATAR_SIZE
-    border_size = cfg.AVATAR_BORDER_SIZE
-    
-    # Download avatar image
-    avatar_data = await download_image(avatar_url)
     
     if not avatar_data:
         # Create placeholder if avatar can't be downloaded
         avatar = Image.new('RGBA', (256, 256), accent_color)
         avatar_draw = ImageDraw.Draw(avatar)
-        try:
-            avatar_font = ImageFont.truetype(cfg.FONT_BOLD, 100) if cfg.FONT_BOLD else ImageFont.load_default()
-        except Exception:
-            avatar_font = ImageFont.load_default()
+        avatar_font = get_font(cfg.FONT_BOLD, 100)
             
         # Draw first character of username
         avatar_draw.text(
@@ -61,30 +272,10 @@ async def process_avatar(
         )
     else:
         # Process downloaded avatar
-        avatar = Image.open(io.BytesIO(avatar_data)).convert("RGBA")
+        avatar = open_image(avatar_data, (avatar_size, avatar_size))
     
     # Create circular avatar
-    avatar_circle = create_circular_image(avatar, avatar_size)
-    
-    # Create border
-    final_size = border_size
-    result = Image.new('RGBA', (final_size, final_size), (0, 0, 0, 0))
-    border = create_circular_image(
-        Image.new('RGBA', (final_size, final_size), accent_color),
-        final_size
-    )
-    
-    # Combine border and avatar
-    result = Image.alpha_composite(result, border)
-    
-    # Calculate position to center avatar on border
-    pos_x = (final_size - avatar_size) // 2
-    pos_y = (final_size - avatar_size) // 2
-    
-    # Paste avatar onto border
-    result.paste(avatar_circle, (pos_x, pos_y), avatar_circle)
-    
-    return result
+    return create_circular_image(avatar, avatar_size)
 
 async def create_welcome_card(
     username: str, 
@@ -112,115 +303,162 @@ async def create_welcome_card(
         custom_message: Custom welcome message
         
     Returns:
-        BytesIO buffer containing the PNG image, or None if creation failed
+        BytesIO buffer containing the JPEG image, or None if creation failed
     """
     try:
-        # Create base image with dark background
-        card = Image.new('RGBA', (cfg.CARD_WIDTH, cfg.CARD_HEIGHT), cfg.DARK_BG)
-        draw = ImageDraw.Draw(card)
+        # Reuse a recently prepared URL background instead of downloading it again
+        url_background = _get_url_background(background_url) if background_url else None
+        
+        # Fetch the avatar and any uncached URL background concurrently
+        avatar_data, bg_data = await asyncio.gather(
+            download_image(_sized_avatar_url(avatar_url)),
+            download_image(background_url) if background_url and url_background is None else asyncio.sleep(0)
+        )
+        
+        # Rendering is pure Pillow work, so keep it off the event loop
+        return await run_render(
+            _render_card,
+            username, avatar_data, server_name, member_count,
+            background_url, url_background, bg_data,
+            background_name, use_random_bg, accent_color, custom_message
+        )
+    except Exception as e:
+        logger.exception(f"Error creating welcome card: {e}")
+        return None
+
+def _select_background(
+    background_url: Optional[str],
+    url_background: Optional[Image.Image],
+    bg_data: Optional[bytes],
+    background_name: Optional[str],
+    use_random_bg: bool,
+    accent_color: Tuple[int, int, int]
+) -> Tuple[Image.Image, bool]:
+    """
+    Pick the card background following the priority order: named library
+    background, URL background, random library background, default library
+    background, then the solid color fallback.
+    
+    Args:
+        background_url: Optional URL for a custom background
+        url_background: The cached, prepared background for background_url, if any
+        bg_data: Background image bytes downloaded from background_url, if not cached
+        background_name: Optional name of a stored background
+        use_random_bg: Whether to use a random background
+        accent_color: RGB tuple for accent color
         
-        # Apply background following the priority order
-        background_applied = False
-        
-        # 1. Try specified background from library
-        if background_name:
-            config = get_backgrounds_config()
-            if background_name in config["backgrounds"]:
-                bg_path = config["backgrounds"][background_name]["path"]
-                if os.path.exists(bg_path):
-                    background = Image.open(bg_path).convert("RGBA")
-                    card = background.copy()
-                    draw = ImageDraw.Draw(card)
-                    background_applied = True
-                    print(f"Using specified background: {background_name}")
-        
-        # 2. Try background from URL
-        if not background_applied and background_url:
-            bg_data = await download_image(background_url)
-            if bg_data:
-                background = Image.open(io.BytesIO(bg_data)).convert("RGBA")
-                background = resize_image(background, cfg.CARD_WIDTH, cfg.CARD_HEIGHT)
-                card = background.copy()
-                draw = ImageDraw.Draw(card)
-                background_applied = True
-                print("Using background from URL")
-        
-        # 3. Try random background
-        if not background_applied and use_random_bg:
-            bg_path = get_random_background()
-            if bg_path and os.path.exists(bg_path):
-                background = Image.open(bg_path).convert("RGBA")
-                card = background.copy()
-                draw = ImageDraw.Draw(card)
-                background_applied = True
-                print("Using random background")
-        
-        # 4. Try default background
-        if not background_applied:
-            bg_path = get_default_background()
-            if bg_path and os.path.exists(bg_path):
-                background = Image.open(bg_path).convert("RGBA")
-                card = background.copy()
-                draw = ImageDraw.Draw(card)
-                background_applied = True
-                print("Using default background")
-            else:
-                print("Using solid color background")
-                
-        # Apply a gradient overlay for better text visibility and aesthetic appeal
-        gradient = Image.new('RGBA', (cfg.CARD_WIDTH, cfg.CARD_HEIGHT), (0, 0, 0, 0))
-        gradient_draw = ImageDraw.Draw(gradient)
-        
-        # Create a dark gradient from bottom to top
-        for y in range(cfg.CARD_HEIGHT):
-            # Make the bottom darker than the top
-            alpha = int(40 + (y / cfg.CARD_HEIGHT * 160))  # 40-200 alpha range
-            gradient_draw.line([(0, y), (cfg.CARD_WIDTH, y)], fill=(0, 0, 0, alpha))
-        
-        card = Image.alpha_composite(card, gradient)
-        
-        # Add stylish side accent bars
-        accent_width = 6
+    Returns:
+        A fresh copy of the background to draw on, and whether its side bars
+        are already drawn
+    """
+    # 1. Try specified background from library
+    if background_name:
+        background = get_composited_background(background_name)
+        if background is not None:
+            logger.info(f"Using specified background: {background_name}")
+            return background.copy(), False
+    
+    # 2. Try background from URL
+    if url_background is not None or bg_data:
+        if url_background is None:
+            # Resize while still RGB if opaque; bilinear is plenty for a
+            # background that's darkened and mostly covered by text
+            background = open_image(bg_data, (cfg.CARD_WIDTH, cfg.CARD_HEIGHT))
+            url_background = ensure_rgba(
+                resize_image(background, cfg.CARD_WIDTH, cfg.CARD_HEIGHT, Image.BILINEAR)
+            )
+            apply_card_gradient(url_background)
+            _cache_url_background(background_url, url_background)
+        logger.info("Using background from URL")
+        return url_background.copy(), False
+    
+    # 3. Try random, then 4. default background from library
+    for enabled, get_path, label in (
+        (use_random_bg, get_random_background, "random"),
+        (True, get_default_background, "default"),
+    ):
+        bg_path = get_path() if enabled else None
+        background = load_composited_background(bg_path) if bg_path else None
+        if background is not None:
+            logger.info(f"Using {label} background")
+            return background.copy(), False
+    
+    # Dark gradient background with the side bars already drawn
+    logger.info("Using solid color background")
+    return _solid_template(tuple(accent_color)).copy(), True
+
+def _render_card(
+    username: str, 
+    avatar_data: Optional[bytes], 
+    server_name: str, 
+    member_count: int, 
+    background_url: Optional[str],
+    url_background: Optional[Image.Image],
+    bg_data: Optional[bytes],
+    background_name: Optional[str],
+    use_random_bg: bool,
+    accent_color: Tuple[int, int, int],
+    custom_message: Optional[str]
+) -> Optional[io.BytesIO]:
+    """
+    Render a welcome card from already-downloaded image data.
+    
+    This is blocking CPU work and is run in a worker thread by create_welcome_card.
+    
+    Args:
+        username: The username to display
+        avatar_data: Avatar image bytes, or None to draw a placeholder
+        server_name: Name of the server
+        member_count: The current member count
+        background_url: Optional URL for a custom background
+        url_background: The cached, prepared background for background_url, if any
+        bg_data: Background image bytes downloaded from background_url, if not cached
+        background_name: Optional name of a stored background
+        use_random_bg: Whether to use a random background
+        accent_color: RGB tuple for accent color
+        custom_message: Custom welcome message
+        
+    Returns:
+        BytesIO buffer containing the JPEG image, or None if creation failed
+    """
+    try:
+        # Every background is a shared cached image with the gradient overlay
+        # (for better text visibility) already applied, so it's copied before drawing
+        card, decorated = _select_background(
+            background_url, url_background, bg_data, background_name, use_random_bg, accent_color
+        )
+        
+        # Add the side accent bars
+        if not decorated:
+            _draw_decorations(card, accent_color)
         draw = ImageDraw.Draw(card)
-        draw.rectangle([(0, 0), (accent_width, cfg.CARD_HEIGHT)], fill=accent_color)  # Left bar
-        draw.rectangle([(cfg.CARD_WIDTH-accent_width, 0), (cfg.CARD_WIDTH, cfg.CARD_HEIGHT)], fill=accent_color)  # Right bar
         
         # Process avatar with enhanced glow effect
-        avatar = await process_avatar(avatar_url, username, accent_color)
+        avatar = process_avatar(avatar_data, username, accent_color)
         
-        # Position avatar
-        avatar_size = avatar.width
+        # Position avatar; the border ring around it sets the footprint
+        avatar_size = cfg.AVATAR_BORDER_SIZE
         avatar_pos_x = (cfg.CARD_WIDTH - avatar_size) // 2
         avatar_pos_y = 100  # Moved higher up from 120
         
-        # Create subtle glow effect behind avatar
-        glow_size = avatar_size + 20
-        glow = Image.new('RGBA', (glow_size, glow_size), (0, 0, 0, 0))
-        glow_draw = ImageDraw.Draw(glow)
-        glow_color = (*accent_color, 60)  # Semi-transparent accent color
-        for i in range(10, 0, -1):
-            glow_draw.ellipse((i, i, glow_size - i, glow_size - i), fill=(*accent_color, 6))
+        # Create subtle glow effect behind avatar (cached per accent color)
+        glow = _glow_sprite(tuple(accent_color))
         
         # Position and paste glow
         glow_pos_x = avatar_pos_x - 10
         glow_pos_y = avatar_pos_y - 10
         card.paste(glow, (glow_pos_x, glow_pos_y), glow)
         
-        # Place avatar on card
-        card.paste(avatar, (avatar_pos_x, avatar_pos_y), avatar)
-        
-        # Load fonts with enhanced sizes
-        try:
-            username_font = ImageFont.truetype(cfg.FONT_BOLD, cfg.USERNAME_FONT_SIZE) if cfg.FONT_BOLD else ImageFont.load_default()
-            title_font = ImageFont.truetype(cfg.FONT_BOLD, cfg.WELCOME_FONT_SIZE) if cfg.FONT_BOLD else ImageFont.load_default()
-            subtitle_font = ImageFont.truetype(cfg.FONT_REGULAR, cfg.MESSAGE_FONT_SIZE) if cfg.FONT_REGULAR else ImageFont.load_default()
-            small_font = ImageFont.truetype(cfg.FONT_REGULAR, cfg.COUNT_FONT_SIZE) if cfg.FONT_REGULAR else ImageFont.load_default()
-        except Exception as e:
-            print(f"Error loading fonts: {e} - Using default fonts")
-            username_font = ImageFont.load_default()
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
+        # Place the cached border, then the avatar centered on it, straight
+        # onto the card instead of assembling a bordered copy first
+        border = _border_sprite(tuple(accent_color))
+        card.paste(border, (avatar_pos_x, avatar_pos_y), border)
+        inset = (avatar_size - avatar.width) // 2
+        card.paste(avatar, (avatar_pos_x + inset, avatar_pos_y + inset), avatar)
+        
+        # Load fonts with enhanced sizes (cached after the first card)
+        subtitle_font = get_font(cfg.FONT_REGULAR, cfg.MESSAGE_FONT_SIZE)
+        small_font = get_font(cfg.FONT_REGULAR, cfg.COUNT_FONT_SIZE)
         
         # Center position for text elements
         center_x = cfg.CARD_WIDTH // 2
@@ -231,43 +469,61 @@ async def create_welcome_card(
         message_y = username_y + 64  # Reduced space
         count_y = message_y + 50  # Reduced space
         
-        # Use smaller font for long usernames
-        if len(username) > 20:
-            username_font = ImageFont.truetype(cfg.FONT_BOLD, 48) if cfg.FONT_BOLD else ImageFont.load_default()
+        # Use the largest username font that actually fits the card width
+        username_font = next(
+            (
+                font for font in (get_font(cfg.FONT_BOLD, size) for size in _USERNAME_FONT_SIZES)
+                if font.getlength(username) <= _USERNAME_MAX_WIDTH
+            ),
+            get_font(cfg.FONT_BOLD, _USERNAME_FONT_SIZES[-1])
+        )
         
         # Add a subtle text shadow effect for better readability
-        def draw_text_with_shadow(x, y, text, font, fill, anchor="mt", shadow_color=(0,0,0,120), shadow_offset=2):
-            # Draw shadow first
-            draw.text((x+shadow_offset, y+shadow_offset), text, font=font, fill=shadow_color, anchor=anchor)
-            # Draw main text
-            draw.text((x, y), text, font=font, fill=fill, anchor=anchor)
-        
-        # Draw text elements with shadows
-        draw_text_with_shadow(center_x, welcome_y, "WELCOME", title_font, cfg.HIGHLIGHT_COLOR)
+        def paste_text_mask(left, top, mask, fill, shadow_offset=2):
+            # Paste the shadow first, then the main text, through the same mask
+            card.paste((0, 0, 0), (left + shadow_offset, top + shadow_offset), mask.point(_SHADOW_ALPHA_LUT))
+            card.paste(fill, (left, top), mask)
+        
+        def draw_text_with_shadow(x, y, text, font, fill, anchor="mt"):
+            # Rasterize the text once into a mask just big enough to hold it.
+            # Text containing newlines is laid out by Pillow's multiline path,
+            # with each line centered
+            left, top, right, bottom = _pixel_bbox(
+                draw.textbbox((x, y), text, font=font, anchor=anchor, align="center")
+            )
+            if right <= left or bottom <= top:
+                return
+            mask = Image.new('L', (right - left, bottom - top), 0)
+            ImageDraw.Draw(mask).text((x - left, y - top), text, font=font, fill=255, anchor=anchor, align="center")
+            paste_text_mask(left, top, mask, fill)
+        
+        # Draw text elements with shadows; the title is the same on every card,
+        # so its mask is rasterized once and reused
+        title_mask, (dx, dy) = _static_text_mask("WELCOME", cfg.FONT_BOLD, cfg.WELCOME_FONT_SIZE, "mt")
+        paste_text_mask(center_x + dx, welcome_y + dy, title_mask, cfg.HIGHLIGHT_COLOR)
         draw_text_with_shadow(center_x, username_y, username, username_font, cfg.LIGHT_TEXT)
         
         # Draw custom or default message (with word wrap for long server names)
         message = custom_message or f"Welcome to {server_name}!"
-        # Wrap text if too long
+        # Wrap text if too long; multiline text can't use the "top" anchor, so
+        # anchor on the first line's ascender instead
         if len(message) > 40:
             message = "\n".join(textwrap.wrap(message, width=40, break_long_words=False))
-        draw_text_with_shadow(center_x, message_y, message, subtitle_font, cfg.LIGHT_TEXT)
-        
-        # Calculate ordinal suffix for member count
-        if 11 <= member_count % 100 <= 13:
-            suffix = "th"  # 11th, 12th, 13th
+            draw_text_with_shadow(center_x, message_y, message, subtitle_font, cfg.LIGHT_TEXT, anchor="ma")
         else:
-            suffix = {1: "st", 2: "nd", 3: "rd"}.get(member_count % 10, "th")
+            draw_text_with_shadow(center_x, message_y, message, subtitle_font, cfg.LIGHT_TEXT)
         
         # Create a highlight box for member count
-        count_text = f"You are the {member_count}{suffix} member"
+        count_text = f"You are the {ordinal_suffix(member_count)} member"
         count_width = center_x * 0.7  # 70% of center_x
         count_height = 40
         count_rect_x = center_x - count_width // 2
         count_rect_y = count_y - 5
         
-        # Draw semi-transparent background
-        draw.rectangle(
+        # Draw semi-transparent background, blended into the card (a plain
+        # draw would store the translucent pixels as-is, and they'd come out
+        # solid black once the alpha channel is dropped for encoding)
+        ImageDraw.Draw(card, "RGBA").rectangle(
             [(count_rect_x, count_rect_y), (count_rect_x + count_width, count_rect_y + count_height)],
             fill=(0, 0, 0, 100),
             outline=accent_color
@@ -280,22 +536,73 @@ async def create_welcome_card(
             anchor="mm"  # Middle-middle anchor
         )
         
-        # Add decorative accent at the bottom
-        decoration_y = cfg.CARD_HEIGHT - 40
-        draw.text((center_x, decoration_y), "• • •", fill=accent_color, font=subtitle_font, anchor="mm")
+        # Add decorative accent at the bottom, over the member count box
+        _draw_ornament(card, accent_color)
         
-        # Save to buffer
+        # Save to buffer; it's uploaded once and discarded, so favour a fast
+        # encode. The card is shown opaque, so drop the alpha channel and
+        # encode as JPEG, keeping full chroma so colored text stays crisp
         buffer = io.BytesIO()
-        card.save(buffer, format="PNG")
+        card.convert("RGB").save(
+            buffer, format="JPEG", quality=cfg.CARD_JPEG_QUALITY, subsampling=0, optimize=False
+        )
         buffer.seek(0)
         
         return buffer
     except Exception as e:
-        print(f"Error creating welcome card: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error rendering welcome card: {e}")
         return None
 
+def _warm_up() -> None:
+    """Populate the font, background and sprite caches used by every card (blocking)."""
+    # Cards are JPEG-encoded; without libjpeg-turbo that's several times slower
+    try:
+        if features.check_feature("libjpeg_turbo") is False:
+            logger.warning("Pillow is not built with libjpeg-turbo; welcome card encoding will be slower")
+    except ValueError:
+        pass  # Pillow too old to report it
+    
+    for path, size in (
+        (cfg.FONT_BOLD, cfg.WELCOME_FONT_SIZE),
+        (cfg.FONT_REGULAR, cfg.MESSAGE_FONT_SIZE),
+        (cfg.FONT_REGULAR, cfg.COUNT_FONT_SIZE),
+        (cfg.FONT_BOLD, 100),
+        *((cfg.FONT_BOLD, size) for size in _USERNAME_FONT_SIZES)
+    ):
+        get_font(path, size)
+    
+    accent_color = tuple(cfg.ACCENT_COLOR)
+    _border_sprite(accent_color)
+    _glow_sprite(accent_color)
+    _solid_template(accent_color)
+    _static_text_mask("WELCOME", cfg.FONT_BOLD, cfg.WELCOME_FONT_SIZE, "mt")
+    _static_text_mask("• • •", cfg.FONT_REGULAR, cfg.MESSAGE_FONT_SIZE, "mm")
+    get_circle_mask(cfg.AVATAR_SIZE)
+    
+    bg_path = get_default_background()
+    if bg_path:
+        load_composited_background(bg_path)
+    
+    # Render a throwaway card whose message wraps onto several lines (anything
+    # over 40 characters), so a layout that can't render fails loudly here
+    # rather than silently on every join to a long-named server
+    if _render_card(
+        "Warm-up", None, "A server whose name is rather long indeed", 1,
+        None, None, None, None, False, accent_color, None
+    ) is None:
+        logger.error("Welcome card self-check failed: a wrapped message did not render")
+
+async def warm_up_welcome_cards() -> None:
+    """
+    Pre-load fonts, the default background and card sprites so the first
+    welcome card after a restart doesn't pay for them. Errors are only logged.
+    """
+    try:
+        await run_render(_warm_up)
+        logger.info("Welcome card caches warmed up")
+    except Exception as e:
+        logger.warning(f"Welcome card warm-up failed: {e}")
+
 def create_welcome_embed(username: str, server_name: str, member_count: int, user_id: int):
     """
     Create a welcome embed to accompany the welcome card.
@@ -10,6 +10,7 @@ ASSETS_DIR = "assets"
 FONTS_DIR = f"{ASSETS_DIR}/fonts"
 BACKGROUNDS_DIR = f"{ASSETS_DIR}/backgrounds"
 BACKGROUNDS_CONFIG = f"{BACKGROUNDS_DIR}/config.json"
+DOWNLOAD_CACHE_DIR = "cache/welcome_cards"  # Recently downloaded avatars and backgrounds
 
 # Create directory structure for assets
 os.makedirs(FONTS_DIR, exist_ok=True)
@@ -36,6 +37,12 @@ HIGHLIGHT_COLOR = (253, 203, 110)    # Warm yellow for highlights
 CARD_WIDTH = 1000                    # Reduced from 1200
 CARD_HEIGHT = 563                    # Reduced from 675 (16:9 aspect ratio)
 
+# --- Output ---
+# Cards are opaque and photo-like, so they're sent as JPEG, which encodes
+# several times faster than PNG and uploads a much smaller file
+CARD_FILENAME = "welcome.jpg"
+CARD_JPEG_QUALITY = 88
+
 # --- Avatar Settings ---
 AVATAR_SIZE = 196                    # Increased from 180
 AVATAR_BORDER_SIZE = AVATAR_SIZE + 12  # Increased border
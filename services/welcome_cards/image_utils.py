@@ -5,16 +5,215 @@ This module provides image processing functions for welcome cards.
 """
 from typing import Optional, Tuple
 import io
+import os
+import hashlib
+import tempfile
+import functools
+import logging
 import time
-import traceback
 import re
+import socket
 import asyncio
 import aiohttp
-from PIL import Image, ImageDraw, ImageOps
-import tempfile
-import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+from . import config as cfg
+from config import WELCOME_DOWNLOAD_IPV6
+
+logger = logging.getLogger(__name__)
+
+# Shared HTTP session, so repeat downloads from the same host reuse pooled
+# keep-alive connections (and cached DNS) instead of a fresh TCP+TLS handshake
+_session: Optional[aiohttp.ClientSession] = None
+
+# Direct-download info in uhdpaper.com page URLs (resolution and image ID)
+_UHD_URL_RE = re.compile(r".*-(\d+x\d+)-uhdpaper\.com-(\d+)@\d+@.*\.jpg")
+
+# Image URLs in scraped HTML: <img src>, <meta content> and CSS backgrounds,
+# as one alternation with a capture group per kind so the page is scanned once
+_IMG_SCRAPE_RE = re.compile(
+    r'<img[^>]+src="([^"]+\.(?:jpg|jpeg|png))"'
+    r'|<meta[^>]+content="([^"]+\.(?:jpg|jpeg|png))"'
+    r'|background-image: url\("([^"]+\.(?:jpg|jpeg|png))"\)'
+)
+
+# Cap on concurrent connections to any one host. Further requests to that host
+# wait in the connector's per-host queue, so a burst of joins doesn't trip
+# upstream rate limits and push downloads into the slow fallbacks
+MAX_CONNECTIONS_PER_HOST = 12
+
+# Bounded worker pool for card rendering. Pillow releases the GIL while decoding,
+# resampling and compositing, so threads render in parallel without pickling
+# images across processes, and a join burst can't oversubscribe the CPU
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+_render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="welcome-render")
+
+async def run_render(func, *args):
+    """Run a blocking Pillow render function on the shared render pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_render_executor, func, *args)
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared download session, creating it on first use.
+    
+    Returns:
+        The module-wide aiohttp ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        # Resolve through aiodns (installed with aiohttp[speedups]) when
+        # available; otherwise aiohttp falls back to its threaded resolver
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except RuntimeError:
+            resolver = None
+        
+        # Pin IPv4 unless IPv6 is opted into: on IPv4-only hosts every new CDN
+        # connection would otherwise race an AAAA attempt that never connects
+        family = socket.AF_UNSPEC if WELCOME_DOWNLOAD_IPV6 else socket.AF_INET
+        
+        connector = aiohttp.TCPConnector(
+            resolver=resolver,
+            family=family,
+            limit=100,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=75,
+            use_dns_cache=True,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+    return _session
+
+async def close_session() -> None:
+    """Close the shared download session, if one was created."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+# Recently downloaded images, in memory and on disk, so repeat URLs (the same
+# background or avatar) skip the network. Entries expire after the TTL
+DOWNLOAD_CACHE_SIZE = 32
+DOWNLOAD_CACHE_TTL = 24 * 60 * 60  # 24 hours
+_download_cache: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+# Expired files are swept from the disk cache at most this often
+DOWNLOAD_CACHE_SWEEP_INTERVAL = 60 * 60  # 1 hour
+_last_sweep = 0.0
+
+# Downloads currently in progress, so a join burst that asks for the same
+# background (or avatar) at once shares a single fetch instead of racing N
+_inflight: "dict[str, asyncio.Task]" = {}
+
+def _disk_cache_path(url: str) -> str:
+    """Get the on-disk cache file for a URL."""
+    digest = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+    return os.path.join(cfg.DOWNLOAD_CACHE_DIR, f"{digest}.bin")
+
+def _read_disk_cache(url: str) -> Optional[bytes]:
+    """Read a cached download from disk, if present and not expired (blocking)."""
+    path = _disk_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > DOWNLOAD_CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_disk_cache(url: str, data: bytes) -> None:
+    """Atomically store a download on disk, sweeping expired entries now and then (blocking)."""
+    try:
+        os.makedirs(cfg.DOWNLOAD_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cfg.DOWNLOAD_CACHE_DIR, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, _disk_cache_path(url))
+    except OSError as e:
+        logger.warning("Could not write download cache: %s", e)
+        return
+    
+    _sweep_disk_cache()
+
+def _sweep_disk_cache() -> None:
+    """Remove expired disk cache files, at most once per sweep interval (blocking)."""
+    global _last_sweep
+    now = time.time()
+    if now - _last_sweep < DOWNLOAD_CACHE_SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    
+    try:
+        with os.scandir(cfg.DOWNLOAD_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if now - entry.stat().st_mtime > DOWNLOAD_CACHE_TTL:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass  # Already removed by a concurrent sweep or replaced
+    except OSError as e:
+        logger.warning("Could not sweep download cache: %s", e)
+
+def _remember_download(url: str, data: bytes) -> None:
+    """Store a download in the in-memory LRU, evicting the oldest entry if full."""
+    _download_cache[url] = (time.monotonic(), data)
+    _download_cache.move_to_end(url)
+    if len(_download_cache) > DOWNLOAD_CACHE_SIZE:
+        _download_cache.popitem(last=False)
 
 async def download_image(url: str) -> Optional[bytes]:
+    """
+    Download an image from a URL, reusing a cached copy if one is fresh.
+    
+    Args:
+        url: The URL of the image to download
+        
+    Returns:
+        Bytes containing the image data, or None if download failed
+    """
+    # 1. In-memory cache
+    cached = _download_cache.get(url)
+    if cached is not None:
+        fetched_at, data = cached
+        if time.monotonic() - fetched_at <= DOWNLOAD_CACHE_TTL:
+            _download_cache.move_to_end(url)
+            return data
+        del _download_cache[url]
+    
+    # 2. Join a download of the same URL that's already under way. The shared
+    # task is shielded so one cancelled caller doesn't abort it for the rest
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(_load_image(url))
+        _inflight[url] = task
+        task.add_done_callback(lambda _: _inflight.pop(url, None))
+    return await asyncio.shield(task)
+
+async def _load_image(url: str) -> Optional[bytes]:
+    """
+    Load an image missing from the in-memory cache, from disk or the network.
+    
+    Args:
+        url: The URL of the image to load
+        
+    Returns:
+        Bytes containing the image data, or None if download failed
+    """
+    # On-disk cache
+    data = await asyncio.to_thread(_read_disk_cache, url)
+    if data is not None:
+        _remember_download(url, data)
+        return data
+    
+    # Network
+    data = await fetch_image(url)
+    if data is not None:
+        _remember_download(url, data)
+        await asyncio.to_thread(_write_disk_cache, url, data)
+    return data
+
+async def fetch_image(url: str) -> Optional[bytes]:
     """
     Download an image from a URL with enhanced error handling and headers.
     
@@ -27,7 +226,7 @@ async def download_image(url: str) -> Optional[bytes]:
     try:
         # Handle uhdpaper.com URLs specifically
         if "uhdpaper.com" in url:
-            print(f"Detected uhdpaper.com URL, using specialized method")
+            logger.debug("Detected uhdpaper.com URL, using specialized method")
             return await download_uhdpaper_image(url)
             
         # Add timeout to prevent hanging on slow connections
@@ -46,51 +245,54 @@ async def download_image(url: str) -> Optional[bytes]:
         }
         
         start_time = time.time()
-        print(f"Starting download from {url}")
+        logger.debug("Starting download from %s", url)
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, headers=headers, allow_redirects=True) as response:
-                if response.status == 200:
-                    data = await response.read()
-                    elapsed = time.time() - start_time
-                    print(f"Download successful: {len(data)} bytes in {elapsed:.2f} seconds")
+        session = await get_session()
+        async with session.get(url, headers=headers, allow_redirects=True, timeout=timeout) as response:
+            if response.status == 200:
+                data = await response.read()
+                elapsed = time.time() - start_time
+                logger.debug("Download successful: %d bytes in %.2f seconds", len(data), elapsed)
+                
+                # Trust the server when it says it's an image; the caller decodes it anyway
+                if response.content_type.startswith('image/'):
+                    return data
+                
+                # Otherwise verify the downloaded data is an image (do a quick check)
+                try:
+                    img_test = Image.open(io.BytesIO(data))
+                    logger.debug("Verified image data: %s format, %dx%d", img_test.format, img_test.width, img_test.height)
+                    return data
+                except Exception as img_err:
+                    logger.warning("Downloaded data is not a valid image: %s", img_err)
                     
-                    # Verify the downloaded data is an image (do a quick check)
-                    try:
-                        img_test = Image.open(io.BytesIO(data))
-                        img_format = img_test.format
-                        img_size = f"{img_test.width}x{img_test.height}"
-                        print(f"Verified image data: {img_format} format, {img_size}")
-                        return data
-                    except Exception as img_err:
-                        print(f"Downloaded data is not a valid image: {img_err}")
-                        
-                        # Debug: Print first 100 bytes to see what we got
-                        content_preview = data[:100]
-                        if b"<!DOCTYPE" in content_preview or b"<html" in content_preview:
-                            print("Received HTML content instead of image data")
-                            # Try alternative specialized approach
-                            return await download_image_with_selenium(url)
-                        
-                        traceback.print_exc()
-                        return None
-                else:
-                    print(f"Failed to download image: HTTP {response.status}")
-                    print(f"Response headers: {response.headers}")
+                    # Check the first 100 bytes for an HTML page served in place of the image
+                    content_preview = data[:100]
+                    if b"<!DOCTYPE" in content_preview or b"<html" in content_preview:
+                        logger.debug("Received HTML content instead of image data")
+                        # Try alternative specialized approach
+                        return await download_image_with_selenium(url)
                     
-                    # Try alternative approach for certain sites
-                    if any(site in url for site in ["uhdpaper.com", "wallpaper", "wallhaven"]):
-                        print("Detected wallpaper site, trying alternative download approach...")
-                        return await download_image_with_session(url)
-                        
                     return None
+            else:
+                logger.warning("Failed to download image: HTTP %d", response.status)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Response headers: %s", dict(response.headers))
+                
+                # Try alternative approach for certain sites, handing this
+                # connection back first so the retry can't wait on it
+                if any(site in url for site in ["uhdpaper.com", "wallpaper", "wallhaven"]):
+                    logger.debug("Detected wallpaper site, trying alternative download approach")
+                    response.release()
+                    return await download_image_with_session(url)
+                    
+                return None
     except Exception as e:
-        print(f"Error downloading image: {str(e)}")
-        traceback.print_exc()
+        logger.warning("Error downloading image from %s: %s", url, e, exc_info=True)
         
         # Try alternative method for problematic URLs
         if "uhdpaper.com" in url or "wallpaper" in url:
-            print("Trying alternative download method for wallpaper site...")
+            logger.debug("Trying alternative download method for wallpaper site")
             return await download_uhdpaper_image(url)
             
         return None
@@ -124,44 +326,56 @@ async def download_image_with_session(url: str) -> Optional[bytes]:
             'sec-ch-ua-platform': '"Windows"',
         }
         
-        print(f"Using alternative download method for: {url}")
+        logger.debug("Using alternative download method for: %s", url)
         
-        # Create a ClientSession that looks more like a browser
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            # First make a HEAD request to check content type
-            async with session.head(url, headers=headers, allow_redirects=True) as head_resp:
-                print(f"HEAD response: {head_resp.status}")
+        # Use the shared session; the browser-like behaviour comes from the headers
+        session = await get_session()
+        # A single GET; its headers tell us the content type
+        async with session.get(url, headers=headers, allow_redirects=True, timeout=timeout) as response:
+            if response.status == 200:
+                # Check content type
+                content_type = response.headers.get('Content-Type', '')
+                logger.debug("Content-Type: %s", content_type)
                 
-            # Now make the actual GET request
-            async with session.get(url, headers=headers, allow_redirects=True) as response:
-                if response.status == 200:
-                    # Check content type
-                    content_type = response.headers.get('Content-Type', '')
-                    print(f"Content-Type: {content_type}")
+                if 'image' in content_type or 'octet-stream' in content_type:
+                    data = await response.read()
+                    logger.debug("Alternative download successful: %d bytes", len(data))
                     
-                    if 'image' in content_type or 'octet-stream' in content_type:
-                        data = await response.read()
-                        print(f"Alternative download successful: {len(data)} bytes")
-                        
-                        # Verify the downloaded data is an image
-                        try:
-                            img_test = Image.open(io.BytesIO(data))
-                            print(f"Image format: {img_test.format}, Size: {img_test.width}x{img_test.height}")
-                            return data
-                        except Exception as e:
-                            print(f"Downloaded data is not a valid image: {e}")
-                            return None
-                    else:
-                        print(f"Content is not an image: {content_type}")
+                    # Trust an explicit image type; only sniff generic binary responses
+                    if response.content_type.startswith('image/'):
+                        return data
+                    
+                    try:
+                        img_test = Image.open(io.BytesIO(data))
+                        logger.debug("Image format: %s, Size: %dx%d", img_test.format, img_test.width, img_test.height)
+                        return data
+                    except Exception as e:
+                        logger.warning("Downloaded data is not a valid image: %s", e)
                         return None
                 else:
-                    print(f"Alternative download failed: HTTP {response.status}")
+                    logger.warning("Content is not an image: %s", content_type)
                     return None
+            else:
+                logger.warning("Alternative download failed: HTTP %d", response.status)
+                return None
     except Exception as e:
-        print(f"Error in alternative download: {str(e)}")
-        traceback.print_exc()
+        logger.warning("Error in alternative download: %s", e, exc_info=True)
         return None
 
+def _verify_image(data: bytes) -> Image.Image:
+    """
+    Fully verify encoded image data; raises if it is truncated or not an image.
+    
+    Args:
+        data: The encoded image bytes
+        
+    Returns:
+        The (verified, no longer loadable) image, for its format and size
+    """
+    img = Image.open(io.BytesIO(data))
+    img.verify()
+    return img
+
 async def download_uhdpaper_image(url: str) -> Optional[bytes]:
     """
     Specialized method for downloading images from uhdpaper.com
@@ -174,18 +388,17 @@ async def download_uhdpaper_image(url: str) -> Optional[bytes]:
         Bytes containing the image data, or None if download failed
     """
     try:
-        print(f"Using specialized uhdpaper downloader for: {url}")
+        logger.debug("Using specialized uhdpaper downloader for: %s", url)
         
         # Extract resolution and image ID from URL
         # Format is typically: .../wallpaper/TITLE-RESOLUTION-uhdpaper.com-ID@X@d.jpg
         # We need to convert it to their direct download format
         
         # Extract ID and resolution
-        pattern = r".*-(\d+x\d+)-uhdpaper\.com-(\d+)@\d+@.*\.jpg"
-        match = re.search(pattern, url)
+        match = _UHD_URL_RE.search(url)
         
         if not match:
-            print("Could not parse UHD Paper URL format")
+            logger.warning("Could not parse UHD Paper URL format")
             return None
         
         resolution = match.group(1)
@@ -193,7 +406,7 @@ async def download_uhdpaper_image(url: str) -> Optional[bytes]:
         
         # Construct direct download URL
         direct_url = f"https://images.uhdpaper.com/wallpaper/{image_id}@{resolution}.jpg"
-        print(f"Constructed direct download URL: {direct_url}")
+        logger.debug("Constructed direct download URL: %s", direct_url)
         
         # Use enhanced session with more browser-like headers
         headers = {
@@ -204,44 +417,28 @@ async def download_uhdpaper_image(url: str) -> Optional[bytes]:
             'sec-ch-ua': '"Chromium";v="96", " Not A;Brand";v="99"',
         }
         
-        # Create a ClientSession that looks more like a browser
+        # Use the shared session; the browser-like behaviour comes from the headers
         timeout = aiohttp.ClientTimeout(total=60)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(direct_url, headers=headers, allow_redirects=True) as response:
-                if response.status == 200:
-                    data = await response.read()
-                    print(f"UHD Paper download successful: {len(data)} bytes")
-                    
-                    # Save to temp file first to verify it's an image
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
-                        temp_file.write(data)
-                        temp_path = temp_file.name
-                    
-                    try:
-                        # Try to open the image to verify it's valid
-                        img = Image.open(temp_path)
-                        img.verify()  # Verify it's an actual image
-                        print(f"Valid image downloaded: {img.format} {img.width}x{img.height}")
-                        
-                        # Read the verified data
-                        with open(temp_path, 'rb') as f:
-                            verified_data = f.read()
-                        
-                        # Clean up
-                        os.unlink(temp_path)
-                        return verified_data
-                    except Exception as e:
-                        print(f"Downloaded file is not a valid image: {e}")
-                        if os.path.exists(temp_path):
-                            os.unlink(temp_path)
-                        return None
-                else:
-                    print(f"Direct download failed: HTTP {response.status}")
-                    # Try scraping the image from the website instead
-                    return await scrape_image_from_page(url)
+        session = await get_session()
+        async with session.get(direct_url, headers=headers, allow_redirects=True, timeout=timeout) as response:
+            if response.status == 200:
+                data = await response.read()
+                logger.debug("UHD Paper download successful: %d bytes", len(data))
+                
+                try:
+                    # Verify it's an actual image, straight from memory and off the event loop
+                    img = await asyncio.to_thread(_verify_image, data)
+                    logger.debug("Valid image downloaded: %s %dx%d", img.format, img.width, img.height)
+                    return data
+                except Exception as e:
+                    logger.warning("Downloaded file is not a valid image: %s", e)
+                    return None
+            else:
+                logger.debug("Direct download failed: HTTP %d", response.status)
+                # Try scraping the image from the website instead
+                return await scrape_image_from_page(url)
     except Exception as e:
-        print(f"Error in UHD Paper download: {str(e)}")
-        traceback.print_exc()
+        logger.warning("Error in UHD Paper download: %s", e, exc_info=True)
         return None
 
 async def scrape_image_from_page(url: str) -> Optional[bytes]:
@@ -255,7 +452,7 @@ async def scrape_image_from_page(url: str) -> Optional[bytes]:
         Bytes containing the image data, or None if download failed
     """
     try:
-        print(f"Attempting to scrape image from page: {url}")
+        logger.debug("Attempting to scrape image from page: %s", url)
         
         # Use a simulated browser session to get the page
         headers = {
@@ -264,62 +461,57 @@ async def scrape_image_from_page(url: str) -> Optional[bytes]:
             'Accept-Language': 'en-US,en;q=0.9',
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    
-                    # Look for image URLs in the HTML
-                    # This is a simplified approach - may need adjustment for specific sites
-                    img_patterns = [
-                        r'<img[^>]+src="([^"]+\.(jpg|jpeg|png))"',
-                        r'<meta[^>]+content="([^"]+\.(jpg|jpeg|png))"',
-                        r'background-image: url\("([^"]+\.(jpg|jpeg|png))"\)',
-                    ]
-                    
-                    all_matches = []
-                    for pattern in img_patterns:
-                        matches = re.findall(pattern, html)
-                        if matches:
-                            all_matches.extend(m[0] if isinstance(m, tuple) else m for m in matches)
-                    
-                    # Filter to find likely high-res images
-                    candidates = [m for m in all_matches if any(term in m for term in ["large", "hd", "original", "download", "wallpaper"])]
-                    
-                    if not candidates and all_matches:
-                        candidates = all_matches  # Use all matches if no filtered candidates
+        session = await get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 200:
+                html = await response.text()
+                
+                # Look for image URLs in the HTML
+                # This is a simplified approach - may need adjustment for specific sites
+                # Group matches by kind, keeping <img> tags first, then <meta>, then CSS
+                matches_by_kind = ([], [], [])
+                for groups in _IMG_SCRAPE_RE.findall(html):
+                    for kind, match in enumerate(groups):
+                        if match:
+                            matches_by_kind[kind].append(match)
+                all_matches = [match for matches in matches_by_kind for match in matches]
+                
+                # Filter to find likely high-res images
+                candidates = [m for m in all_matches if any(term in m for term in ["large", "hd", "original", "download", "wallpaper"])]
+                
+                if not candidates and all_matches:
+                    candidates = all_matches  # Use all matches if no filtered candidates
+                
+                if candidates:
+                    logger.debug("Found %d image candidates, trying first one", len(candidates))
                     
-                    if candidates:
-                        print(f"Found {len(candidates)} image candidates, trying first one")
+                    # Try to download the first candidate
+                    img_url = candidates[0]
+                    # Handle relative URLs
+                    if img_url.startswith('/'):
+                        base_url = '/'.join(url.split('/')[:3])  # http(s)://domain.com
+                        img_url = base_url + img_url
                         
-                        # Try to download the first candidate
-                        img_url = candidates[0]
-                        # Handle relative URLs
-                        if img_url.startswith('/'):
-                            base_url = '/'.join(url.split('/')[:3])  # http(s)://domain.com
-                            img_url = base_url + img_url
+                    logger.debug("Trying to download image from: %s", img_url)
+                    
+                    # Simple download of the image
+                    async with session.get(img_url, headers={'User-Agent': headers['User-Agent']}) as img_resp:
+                        if img_resp.status == 200:
+                            data = await img_resp.read()
+                            logger.debug("Downloaded image data: %d bytes", len(data))
                             
-                        print(f"Trying to download image from: {img_url}")
-                        
-                        # Simple download of the image
-                        async with session.get(img_url, headers={'User-Agent': headers['User-Agent']}) as img_resp:
-                            if img_resp.status == 200:
-                                data = await img_resp.read()
-                                print(f"Downloaded image data: {len(data)} bytes")
-                                
-                                # Verify it's an image
-                                try:
-                                    img_test = Image.open(io.BytesIO(data))
-                                    print(f"Successfully scraped image: {img_test.format} {img_test.width}x{img_test.height}")
-                                    return data
-                                except Exception as e:
-                                    print(f"Scraped data is not a valid image: {e}")
-                
-                print("Could not find valid image in page content")
-                return None
+                            # Verify it's an image
+                            try:
+                                img_test = Image.open(io.BytesIO(data))
+                                logger.debug("Successfully scraped image: %s %dx%d", img_test.format, img_test.width, img_test.height)
+                                return data
+                            except Exception as e:
+                                logger.debug("Scraped data is not a valid image: %s", e)
+            
+            logger.warning("Could not find valid image in page content")
+            return None
     except Exception as e:
-        print(f"Error scraping image: {str(e)}")
-        traceback.print_exc()
+        logger.warning("Error scraping image: %s", e, exc_info=True)
         return None
 
 # ---  Alternative download method for last resort ---
@@ -334,14 +526,82 @@ async def download_image_with_selenium(url: str) -> Optional[bytes]:
     Returns:
         Bytes containing the image data, or None if download failed
     """
-    print("Selenium download method requested but not implemented.")
-    print("To add this functionality, install selenium and appropriate webdriver.")
+    logger.warning("Selenium download method requested but not implemented; "
+                   "install selenium and a webdriver to add it")
     
     # This is a placeholder - implementing Selenium would require additional dependencies
     # that might not be available on all systems where the bot runs.
     return None
 
-def resize_image(image: Image.Image, target_width: int, target_height: int) -> Image.Image:
+@functools.lru_cache(maxsize=32)
+def get_font(path: Optional[str], size: int) -> ImageFont.ImageFont:
+    """
+    Load a TrueType font, caching it so each font file is parsed only once per size.
+    
+    Args:
+        path: Path to the font file, or None to use Pillow's default font
+        size: Font size in points
+        
+    Returns:
+        The loaded font, or the default font if it could not be loaded
+    """
+    if not path:
+        return ImageFont.load_default()
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception as e:
+        logger.warning(f"Error loading font {path}: {e} - Using default font")
+        return ImageFont.load_default()
+
+def ensure_rgba(image: Image.Image) -> Image.Image:
+    """
+    Return the image in RGBA mode, converting only if it isn't already.
+    
+    Args:
+        image: The PIL Image to check
+        
+    Returns:
+        The same image if it's already RGBA, otherwise an RGBA copy
+    """
+    return image if image.mode == "RGBA" else image.convert("RGBA")
+
+# Default filter for shrinking avatars and backgrounds. At the sizes a card is
+# shown, bicubic is indistinguishable from Lanczos and about twice as fast
+RESAMPLE_FILTER = Image.BICUBIC
+
+def open_image(data: bytes, min_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """
+    Decode image bytes into an RGB or RGBA image.
+    
+    Opaque images stay RGB, so resizing them doesn't process an alpha channel;
+    call ensure_rgba() once the image is down to its final size.
+    
+    For JPEGs, the decoder is asked to downscale during decoding (by 1/2, 1/4
+    or 1/8) as far as it can while staying at least min_size, which skips most
+    of the decode work for large photos that are about to be shrunk anyway.
+    
+    Args:
+        data: The encoded image bytes
+        min_size: Optional (width, height) the decoded image must still cover
+        
+    Returns:
+        The decoded image, in RGB mode if it's opaque and RGBA otherwise
+    """
+    image = Image.open(io.BytesIO(data))
+    if min_size and image.format == "JPEG":
+        image.draft("RGB", min_size)
+    
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+def resize_image(
+    image: Image.Image,
+    target_width: int,
+    target_height: int,
+    resample: int = RESAMPLE_FILTER
+) -> Image.Image:
     """
     Resize and crop image to fit target dimensions while maintaining aspect ratio.
     
@@ -349,33 +609,76 @@ def resize_image(image: Image.Image, target_width: int, target_height: int) -> I
         image: The PIL Image object to resize
         target_width: The desired width in pixels
         target_height: The desired height in pixels
+        resample: The resampling filter for the final resize pass
         
     Returns:
         A resized and cropped PIL Image
     """
-    # Calculate aspect ratios
+    # Work out the centered region of the source with the target aspect ratio
     img_ratio = image.width / image.height
     target_ratio = target_width / target_height
     
     if img_ratio > target_ratio:
-        # Image is wider than target
-        new_height = target_height
-        new_width = int(target_height * img_ratio)
+        # Image is wider than target: keep the full height, trim the sides
+        crop_width = image.height * target_ratio
+        left = (image.width - crop_width) / 2
+        box = (left, 0, left + crop_width, image.height)
     else:
-        # Image is taller than target
-        new_width = target_width
-        new_height = int(target_width / img_ratio)
+        # Image is taller than target: keep the full width, trim top and bottom
+        crop_height = image.width / target_ratio
+        top = (image.height - crop_height) / 2
+        box = (0, top, image.width, top + crop_height)
     
-    # Resize to maintain aspect ratio
-    resized = image.resize((new_width, new_height), Image.LANCZOS)
+    # Resize just that region in one pass, so no oversized intermediate is
+    # made and cropped. When shrinking, let Pillow pre-reduce with a cheap
+    # box filter before the final pass (as thumbnail() does)
+    shrinking = target_width <= box[2] - box[0] and target_height <= box[3] - box[1]
+    return image.resize(
+        (target_width, target_height),
+        resample,
+        box=box,
+        reducing_gap=2.0 if shrinking else None
+    )
+
+@functools.lru_cache(maxsize=4)
+def get_circle_mask(size: int) -> Image.Image:
+    """
+    Build an antialiased circular mask, once per diameter.
     
-    # Center crop
-    left = (new_width - target_width) // 2
-    top = (new_height - target_height) // 2
-    right = left + target_width
-    bottom = top + target_height
+    Args:
+        size: The diameter of the circle
+        
+    Returns:
+        A size x size 'L' mask, drawn at 4x and downsampled for smooth edges
+    """
+    mask = Image.new('L', (size * 4, size * 4), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size * 4, size * 4), fill=255)
+    return mask.resize((size, size), Image.LANCZOS)
+
+@functools.lru_cache(maxsize=1)
+def get_gradient_mask() -> Image.Image:
+    """
+    Build the mask for the dark gradient that makes the bottom of the card darker than the top.
     
-    return resized.crop((left, top, right, bottom))
+    It depends only on the card size, so it's built once.
+    
+    Returns:
+        A card-sized 'L' image with values ramping from 40 at the top to 200 at the bottom
+    """
+    # One column of alpha values, stretched across the card width
+    column = Image.new('L', (1, cfg.CARD_HEIGHT))
+    column.putdata([int(40 + (y / cfg.CARD_HEIGHT * 160)) for y in range(cfg.CARD_HEIGHT)])
+    return column.resize((cfg.CARD_WIDTH, cfg.CARD_HEIGHT), Image.NEAREST)
+
+def apply_card_gradient(image: Image.Image) -> None:
+    """
+    Darken a card-sized image with the card gradient, in place, by pasting
+    black through the gradient mask.
+    
+    Args:
+        image: The card-sized image to darken
+    """
+    image.paste((0, 0, 0), (0, 0, cfg.CARD_WIDTH, cfg.CARD_HEIGHT), get_gradient_mask())
 
 def create_circular_image(image: Image.Image, size: int, bg_color=None) -> Image.Image:
     """
@@ -389,17 +692,11 @@ def create_circular_image(image: Image.Image, size: int, bg_color=None) -> Image
     Returns:
         A circular PIL Image
     """
-    # Resize the image to fit the circle
-    image = image.resize((size, size), Image.LANCZOS)
-    
-    # Create mask for circular crop
-    mask = Image.new('L', (size, size), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, size, size), fill=255)
+    # Resize the image to fit the circle (always a new image, so it's safe to modify)
+    result = image.resize((size, size), RESAMPLE_FILTER, reducing_gap=2.0)
     
-    # Apply mask to create circular image
-    result = ImageOps.fit(image, mask.size, centering=(0.5, 0.5))
-    result.putalpha(mask)
+    # Apply the cached mask to create circular image
+    result.putalpha(get_circle_mask(size))
     
     # Add background if specified
     if bg_color:
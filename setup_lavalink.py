@@ -4,6 +4,7 @@ Lavalink Setup Script
 This script downloads the latest version of Lavalink.jar and sets up the directory structure.
 """
 import os
+import re
 import sys
 import requests
 import json
@@ -12,8 +13,22 @@ import shutil
 import zipfile
 import platform
 
+# Parse the release payload with orjson when it's installed, stdlib json otherwise
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 LAVALINK_DIR = "lavalink"
 LAVALINK_RELEASES_API = "https://api.github.com/repos/lavalink-devs/Lavalink/releases/latest"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Copy the jar to disk in 1 MiB blocks
+MIN_JAVA_VERSION = 11
+
+# Version line of `java -version`, e.g. 'openjdk version "17.0.2"' or 'java version "1.8.0_392"'
+_JAVA_VERSION_RE = re.compile(r'version "(\d+)(?:\.(\d+))?')
+
+# Shared HTTP session so the release lookup and the jar download reuse a pooled connection
+session = requests.Session()
 
 def print_step(step):
     """Print a step with formatting."""
@@ -30,17 +45,25 @@ def check_java():
         # Java will output version to stderr
         output = result.stderr
         
-        if "version" in output:
+        match = _JAVA_VERSION_RE.search(output)
+        if match:
             print("✓ Java is installed!")
             
-            # Check version
-            if "1.8" in output or "11" in output or "13" in output or "17" in output or "21" in output:
-                print("✓ Java version is sufficient (needs Java 11+)")
+            # Check the major version; Java 8 and older report it as "1.x"
+            major = int(match.group(1))
+            if major == 1 and match.group(2):
+                major = int(match.group(2))
+            
+            if major >= MIN_JAVA_VERSION:
+                print(f"✓ Java version is sufficient (needs Java {MIN_JAVA_VERSION}+)")
                 return True
             else:
-                print("✗ Java version may be too old. Lavalink requires Java 11 or newer.")
+                print(f"✗ Java version may be too old. Lavalink requires Java {MIN_JAVA_VERSION} or newer.")
                 print(f"  Detected: {output.splitlines()[0]}")
                 return False
+        
+        print("✗ Could not determine the installed Java version.")
+        return False
     except Exception as e:
         print(f"✗ Error checking Java: {e}")
         print("✗ Java does not appear to be installed or is not in your PATH.")
@@ -56,18 +79,13 @@ def download_lavalink():
     
     # Get the latest release info
     try:
-        response = requests.get(LAVALINK_RELEASES_API)
+        response = session.get(LAVALINK_RELEASES_API)
         response.raise_for_status()
-        release_data = response.json()
+        release_data = json_loads(response.content)
         
-        # Find the Lavalink.jar asset
+        # Find the Lavalink.jar asset, stopping at the first match
         assets = release_data.get("assets", [])
-        jar_asset = None
-        
-        for asset in assets:
-            if asset["name"].endswith(".jar"):
-                jar_asset = asset
-                break
+        jar_asset = next((a for a in assets if a["name"] == "Lavalink.jar"), None)
         
         if not jar_asset:
             print("✗ Could not find Lavalink.jar in the latest release.")
@@ -80,11 +98,12 @@ def download_lavalink():
         print(f"Downloading from: {jar_url}")
         print(f"Saving to: {jar_path}")
         
-        with requests.get(jar_url, stream=True) as r:
+        with session.get(jar_url, stream=True) as r:
             r.raise_for_status()
-            with open(jar_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Stream the raw body straight to an unbuffered file in large blocks
+            r.raw.decode_content = True
+            with open(jar_path, 'wb', buffering=0) as f:
+                shutil.copyfileobj(r.raw, f, length=DOWNLOAD_CHUNK_SIZE)
         
         print(f"✓ Downloaded Lavalink.jar v{release_data['tag_name']}")
         return True
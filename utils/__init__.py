@@ -3,6 +3,14 @@ Utilities package containing helper functions.
 
 This package exports commonly used utility functions from the .common module directly.
 """
-from .common import get_uptime, get_command_suggestion, create_error_embed, ordinal_suffix
+from .common import (
+    get_uptime, get_command_suggestion, get_platform_info,
+    create_error_embed, ordinal_suffix
+)
+from .logger import setup_logging, stop_logging
 
-__all__ = ['get_uptime', 'get_command_suggestion', 'create_error_embed', 'ordinal_suffix']
+__all__ = [
+    'get_uptime', 'get_command_suggestion', 'get_platform_info',
+    'create_error_embed', 'ordinal_suffix',
+    'setup_logging', 'stop_logging'
+]
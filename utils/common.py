@@ -4,13 +4,22 @@ AI Discord Bot - Common Utilities Module
 This module contains utility functions used throughout the bot.
 """
 import time
-import difflib
-from typing import Optional
+import functools
+from typing import Optional, Tuple
 import discord
 from config import COMMANDS
 
-# Bot start time for uptime calculation
-start_time = time.time()
+# Bot start time for uptime calculation (monotonic, immune to clock changes)
+_START_NS = time.monotonic_ns()
+
+# Ordinal suffix for every value of num % 100 ("st" for 1, 21, ..., "th" for 11-13)
+_SUFFIX_FOR_LAST2 = tuple(
+    "th" if 11 <= n <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    for n in range(100)
+)
+
+# Command names for suggestions, computed once since COMMANDS never changes at runtime
+_CMD_KEYS = tuple(sorted(COMMANDS))
 
 def get_uptime() -> str:
     """
@@ -19,7 +28,19 @@ def get_uptime() -> str:
     Returns:
         Formatted string showing the uptime duration
     """
-    uptime_seconds = int(time.time() - start_time)
+    return _format_uptime((time.monotonic_ns() - _START_NS) // 1_000_000_000)
+
+@functools.lru_cache(maxsize=1)
+def _format_uptime(uptime_seconds: int) -> str:
+    """
+    Format an uptime in whole seconds; repeat calls within the same second hit the cache.
+    
+    Args:
+        uptime_seconds: The uptime in seconds
+        
+    Returns:
+        Formatted string such as "1d 2h 3m 4s"
+    """
     days, remainder = divmod(uptime_seconds, 86400)
     hours, remainder = divmod(remainder, 3600)
     minutes, seconds = divmod(remainder, 60)
@@ -35,9 +56,10 @@ def get_uptime() -> str:
     
     return " ".join(parts)
 
+@functools.lru_cache(maxsize=256)
 def get_command_suggestion(cmd: str) -> Optional[str]:
     """
-    Get a command suggestion based on user input.
+    Get a command suggestion based on user input; repeated typos hit the cache.
     
     Args:
         cmd: The command string to find matches for
@@ -45,10 +67,21 @@ def get_command_suggestion(cmd: str) -> Optional[str]:
     Returns:
         The closest matching command, or None if no match found
     """
-    available_commands = list(COMMANDS.keys())
-    matches = difflib.get_close_matches(cmd, available_commands, n=1, cutoff=0.5)
+    import difflib  # Deferred: only needed when a command is mistyped
+    matches = difflib.get_close_matches(cmd, _CMD_KEYS, n=1, cutoff=0.5)
     return matches[0] if matches else None
 
+@functools.lru_cache(maxsize=None)
+def get_platform_info() -> Tuple[str, str]:
+    """
+    Get the Python version and OS description, queried once and cached.
+    
+    Returns:
+        A tuple of (python_version, "system release")
+    """
+    import platform  # Deferred: only needed for startup/info output
+    return platform.python_version(), f"{platform.system()} {platform.release()}"
+
 def create_error_embed(title: str, description: str, **kwargs) -> discord.Embed:
     """
     Create a standardized error embed.
@@ -78,8 +111,4 @@ def ordinal_suffix(num: int) -> str:
     Returns:
         The number with its ordinal suffix
     """
-    if 11 <= num % 100 <= 13:
-        return f"{num}th"
-        
-    suffix = {1: "st", 2: "nd", 3: "rd"}.get(num % 10, "th")
-    return f"{num}{suffix}"
+    return f"{num}{_SUFFIX_FOR_LAST2[num % 100]}"
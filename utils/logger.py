@@ -0,0 +1,51 @@
+"""
+AI Discord Bot - Logging Setup Module
+
+This module configures non-blocking logging for the bot. Log records are
+pushed onto a queue by the event loop thread and written out by a background
+listener thread, so slow stdout/pipe writes never stall the asyncio loop.
+"""
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    Args:
+        level: The root logger level
+
+    Returns:
+        The running QueueListener (stop it on shutdown to flush pending records)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging() -> None:
+    """Stop the background listener, flushing any queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None